@@ -9,11 +9,72 @@ import time
 import random
 import json
 import logging
-from typing import List, Dict, Any, Optional, Callable, Awaitable
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Iterable, Union, AsyncIterable, AsyncIterator, Coroutine
 from dataclasses import dataclass
 from pathlib import Path
 import concurrent.futures
 import threading
+import collections
+import atexit
+import hashlib
+import functools
+import os
+import sys
+
+# uvloop以libuv的C实现替换默认事件循环; Windows或未安装时回退到标准asyncio
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# orjson以Rust实现JSON编解码, 未安装时回退到标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 设置环境变量 USE_UVLOOP=0 可强制使用标准asyncio事件循环
+USE_UVLOOP = (
+    uvloop is not None
+    and sys.platform != 'win32'
+    and os.environ.get('USE_UVLOOP', '1') != '0'
+)
+
+def _json_dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+async def _capture_exception(coro: Awaitable[Any]) -> Any:
+    """把协程抛出的异常作为返回值, 避免TaskGroup取消其余任务"""
+    try:
+        return await coro
+    except Exception as e:
+        return e
+
+async def run_concurrently(coros: Iterable[Coroutine[Any, Any, Any]],
+                           return_exceptions: bool = False) -> List[Any]:
+    """并发运行一组协程并按顺序返回结果
+    
+    Python 3.11+ 使用asyncio.TaskGroup结构化并发, 更早版本回退到asyncio.gather
+    """
+    coros = list(coros)
+    if sys.version_info < (3, 11):
+        return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+    if return_exceptions:
+        coros = [_capture_exception(coro) for coro in coros]
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(coro) for coro in coros]
+    except BaseExceptionGroup as eg:
+        # 与gather一致抛出首个原始异常, 调用方的 except SomeError 仍能匹配
+        raise eg.exceptions[0] from None
+    return [task.result() for task in tasks]
 
 # 研究1: 基础异步编程模式
 class BasicAsyncPatterns:
@@ -36,7 +97,7 @@ class BasicAsyncPatterns:
             BasicAsyncPatterns.simple_coroutine("Task3", 1.5)
         ]
         
-        results = await asyncio.gather(*tasks)
+        results = await run_concurrently(tasks)
         return results
     
     @staticmethod
@@ -52,34 +113,126 @@ class BasicAsyncPatterns:
 class AsyncHTTPClient:
     """异步HTTP客户端研究"""
     
+    STREAM_CHUNK_SIZE = 64 * 1024
+    
     def __init__(self, max_concurrent: int = 10):
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        # 用计数器+Condition实现准入控制, 与Semaphore不同可在运行时调整并发上限
+        self._cond = asyncio.Condition()
+        self._active = 0
+        self._cmax = max_concurrent
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 归还名额后负责发通知的任务, 持有强引用以免执行前被回收
+        self._notify_tasks: set = set()
         self.session: Optional[aiohttp.ClientSession] = None
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # 同一主机的大量并发请求复用连接并缓存DNS, 避免重复握手
+        connector = aiohttp.TCPConnector(
+            limit=self._cmax * 2,
+            limit_per_host=self._cmax,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True,
+            keepalive_timeout=30
+        )
+        # 连接器由session持有, session.close()时一并关闭
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30),
+            json_serialize=_json_dumps
+        )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
     
+    async def _acquire(self):
+        """等待并占用一个并发名额"""
+        async with self._cond:
+            while self._active >= self._cmax:
+                try:
+                    await self._cond.wait()
+                except asyncio.CancelledError:
+                    # 3.13之前Condition.wait()被取消时会吞掉已收到的通知,
+                    # 转交给下一个等待者, 否则其余等待者可能永远不被唤醒
+                    self._cond.notify(1)
+                    raise
+            self._active += 1
+    
+    def _release(self):
+        """归还并发名额, 只唤醒一个等待者
+        
+        同步递减计数: 在调用方的finally中不做可被取消的await, 名额不会泄漏.
+        notify需要持有锁, 交给独立任务完成, 调用方被取消也不影响它.
+        """
+        self._active -= 1
+        task = asyncio.get_running_loop().create_task(self._notify_one())
+        self._notify_tasks.add(task)
+        task.add_done_callback(self._notify_tasks.discard)
+    
+    async def _notify_one(self):
+        async with self._cond:
+            self._cond.notify(1)
+    
+    async def resize(self, new_max: int):
+        """运行时调整最大并发数"""
+        async with self._cond:
+            self._cmax = new_max
+            self._cond.notify_all()
+    
+    @staticmethod
+    async def response_json(response: aiohttp.ClientResponse) -> Any:
+        """解析JSON响应体, 绕过aiohttp基于标准库json的response.json()"""
+        return _json_loads(await response.read())
+    
     async def fetch_url(self, url: str) -> Dict[str, Any]:
-        """获取单个URL"""
-        async with self.semaphore:
+        """获取单个URL, 相同URL的并发请求合并为一次网络访问"""
+        task = self._inflight.get(url)
+        if task is None:
+            # 真正的请求作为独立任务运行, 不归属于任何一个调用方
+            task = asyncio.ensure_future(self._fetch_url(url))
+            self._inflight[url] = task
+            task.add_done_callback(functools.partial(self._forget_inflight, url))
+        # 包括首个调用方在内都经shield等待: 某个调用方被取消只取消它自己的等待,
+        # 共享请求继续执行, 其余等待者照常拿到结果
+        return dict(await asyncio.shield(task))
+    
+    def _forget_inflight(self, url: str, task: asyncio.Future) -> None:
+        if self._inflight.get(url) is task:
+            del self._inflight[url]
+    
+    async def _fetch_url(self, url: str) -> Dict[str, Any]:
+        await self._acquire()
+        try:
+            start_time = time.perf_counter_ns()
             async with self.session.get(url) as response:
-                data = await response.text()
+                # 流式读取只累计字节数, 不把整个响应体物化为str
+                length = 0
+                async for chunk in response.content.iter_chunked(self.STREAM_CHUNK_SIZE):
+                    length += len(chunk)
                 return {
                     'url': url,
                     'status': response.status,
-                    'content_length': len(data),
-                    'response_time': time.time()
+                    'content_length': length,
+                    'response_time': (time.perf_counter_ns() - start_time) / 1e9
                 }
+        finally:
+            self._release()
+    
+    async def fetch_url_stream(self, url: str):
+        """流式获取URL内容, 逐块产出bytes"""
+        await self._acquire()
+        try:
+            async with self.session.get(url) as response:
+                async for chunk in response.content.iter_chunked(self.STREAM_CHUNK_SIZE):
+                    yield chunk
+        finally:
+            self._release()
     
     async def fetch_multiple_urls(self, urls: List[str]) -> List[Dict[str, Any]]:
         """并发获取多个URL"""
         tasks = [self.fetch_url(url) for url in urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await run_concurrently(tasks, return_exceptions=True)
         
         valid_results = []
         for result in results:
@@ -91,46 +244,198 @@ class AsyncHTTPClient:
         return valid_results
 
 # 研究3: 异步文件IO
+_BUFFER_END = object()
+
+async def buffered(aiterable: AsyncIterable[Any], n: int = 1) -> AsyncIterator[Any]:
+    """预取包装器: 后台任务提前迭代至多n个元素, 使上游产出与下游处理重叠"""
+    queue = asyncio.Queue(maxsize=n)
+    
+    async def _fill():
+        try:
+            async for item in aiterable:
+                await queue.put((item, None))
+        except Exception as e:
+            await queue.put((_BUFFER_END, e))
+        else:
+            await queue.put((_BUFFER_END, None))
+    
+    fill_task = asyncio.create_task(_fill())
+    try:
+        while True:
+            item, exc = await queue.get()
+            if item is _BUFFER_END:
+                if exc is not None:
+                    raise exc
+                break
+            yield item
+    finally:
+        fill_task.cancel()
+
 class AsyncFileIO:
     """异步文件IO操作研究"""
     
     @staticmethod
     async def read_large_file(file_path: str, chunk_size: int = 8192) -> str:
         """异步读取大文件"""
-        content = ""
-        async with aiofiles.open(file_path, 'r', encoding='utf-8') as file:
+        # 以二进制追加到bytearray, 最后统一解码一次, 避免str反复拼接的O(N^2)拷贝
+        buffer = bytearray()
+        async with aiofiles.open(file_path, 'rb') as file:
             while True:
                 chunk = await file.read(chunk_size)
                 if not chunk:
                     break
-                content += chunk
-        return content
+                buffer.extend(chunk)
+        return buffer.decode('utf-8')
     
     @staticmethod
-    async def write_large_file(file_path: str, content: str, chunk_size: int = 8192) -> int:
+    async def write_large_file(file_path: str, content: Union[str, Iterable[str]]) -> int:
         """异步写入大文件"""
         bytes_written = 0
-        async with aiofiles.open(file_path, 'w', encoding='utf-8') as file:
-            for i in range(0, len(content), chunk_size):
-                chunk = content[i:i+chunk_size]
-                await file.write(chunk)
-                bytes_written += len(chunk)
+        async with aiofiles.open(file_path, 'wb') as file:
+            if isinstance(content, str):
+                # 已在内存中的字符串一次写入, 避免逐块切片和多次线程池往返
+                data = content.encode('utf-8')
+                await file.write(data)
+                bytes_written = len(data)
+            else:
+                # 只有生成器等流式内容才需要分块写入
+                for chunk in content:
+                    data = chunk.encode('utf-8')
+                    await file.write(data)
+                    bytes_written += len(data)
         return bytes_written
     
+    @staticmethod
+    def _sendfile_copy(src: str, dst: str) -> int:
+        """在内核中完成文件拷贝, 数据不经过用户态"""
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            size = os.fstat(fsrc.fileno()).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        return offset
+    
+    @staticmethod
+    async def copy_file(src: str, dst: str) -> int:
+        """异步拷贝文件"""
+        loop = asyncio.get_running_loop()
+        # 显式使用常驻IO线程池; 不设为默认执行器, 否则asyncio.run结束时会将其关闭
+        return await loop.run_in_executor(_IO_POOL, AsyncFileIO._sendfile_copy, src, dst)
+    
     @staticmethod
     async def process_files_concurrently(file_paths: List[str], 
                                        processor: Callable[[str], Awaitable[str]]) -> List[str]:
         """并发处理多个文件"""
         tasks = [processor(file_path) for file_path in file_paths]
-        results = await asyncio.gather(*tasks)
+        results = await run_concurrently(tasks)
         return results
+    
+    @staticmethod
+    async def process_files_stream(file_paths: AsyncIterable[str],
+                                   processor: Callable[[str], Awaitable[str]],
+                                   prefetch: int = 4) -> AsyncIterator[str]:
+        """流式处理文件: 调用方消费当前结果时, 后续文件已在后台处理"""
+        async def _results():
+            async for file_path in file_paths:
+                yield await processor(file_path)
+        
+        async for result in buffered(_results(), prefetch):
+            yield result
 
 # 研究4: 异步生产者-消费者模式
+# 单条流水线的轻量生产者-消费者可直接使用上面的buffered()预取包装器
+class RingBatchQueue:
+    """固定容量的环形批量队列
+    
+    生产者按批写入、消费者按批取出, 每次唤醒处理一批数据,
+    避免asyncio.Queue逐项put/get带来的Future分配和调度开销。
+    事件循环是单线程的, 索引计算之间没有await, 因此无需加锁。
+    """
+    
+    def __init__(self, capacity: int = 100):
+        self._capacity = capacity
+        self._ring = collections.deque()
+        self._head = 0  # 累计取出数量
+        self._tail = 0  # 累计放入数量
+        self._unfinished = 0
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._all_done = asyncio.Event()
+        self._all_done.set()
+    
+    def qsize(self) -> int:
+        return self._tail - self._head
+    
+    def empty(self) -> bool:
+        return self._tail == self._head
+    
+    async def put(self, item: Any):
+        """放入单个元素"""
+        await self.put_batch([item])
+    
+    async def put_batch(self, items: List[Any]):
+        """批量放入, 队列满时等待消费者腾出空间"""
+        i = 0
+        while i < len(items):
+            while self.qsize() >= self._capacity:
+                self._not_full.clear()
+                await self._not_full.wait()
+            n = min(len(items) - i, self._capacity - self.qsize())
+            self._ring.extend(items[i:i + n])
+            self._tail += n
+            self._unfinished += n
+            i += n
+            self._all_done.clear()
+            self._not_empty.set()
+    
+    def get_nowait(self) -> Any:
+        """非阻塞取出单个元素"""
+        if self.empty():
+            raise asyncio.QueueEmpty
+        return self._take(1)[0]
+    
+    async def get(self) -> Any:
+        """取出单个元素"""
+        return (await self.get_batch(1))[0]
+    
+    async def get_batch(self, max_items: int) -> List[Any]:
+        """等待队列非空后一次取出至多max_items个元素"""
+        while self.empty():
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self._take(min(max_items, self.qsize()))
+    
+    def _take(self, n: int) -> List[Any]:
+        popleft = self._ring.popleft
+        batch = [popleft() for _ in range(n)]
+        self._head += n
+        self._not_full.set()
+        if self.empty():
+            self._not_empty.clear()
+        return batch
+    
+    def task_done(self, n: int = 1):
+        """标记n个元素处理完成"""
+        if n > self._unfinished:
+            raise ValueError('task_done() called too many times')
+        self._unfinished -= n
+        if self._unfinished == 0:
+            self._all_done.set()
+    
+    async def join(self):
+        """等待所有元素处理完成"""
+        await self._all_done.wait()
+
 class AsyncProducerConsumer:
     """异步生产者-消费者模式"""
     
-    def __init__(self, max_size: int = 100):
-        self.queue = asyncio.Queue(maxsize=max_size)
+    def __init__(self, max_size: int = 100, batch_size: int = 64):
+        self.queue = RingBatchQueue(capacity=max_size)
+        self.batch_size = batch_size
         self.producer_count = 0
         self.consumer_count = 0
         self.results = []
@@ -148,14 +453,15 @@ class AsyncProducerConsumer:
         processed = []
         while True:
             try:
-                item = await asyncio.wait_for(self.queue.get(), timeout=2.0)
-                processed_item = item * 2
-                processed.append(processed_item)
-                self.consumer_count += 1
-                print(f"Consumer {consumer_id} processed: {item} -> {processed_item}")
-                self.queue.task_done()
+                batch = await asyncio.wait_for(self.queue.get_batch(self.batch_size), timeout=2.0)
             except asyncio.TimeoutError:
                 break
+            # 每批只有一次await唤醒, 批内处理与输出也按批进行
+            processed_batch = [item * 2 for item in batch]
+            processed.extend(processed_batch)
+            print(f"Consumer {consumer_id} processed: {batch} -> {processed_batch}")
+            self.consumer_count += len(batch)
+            self.queue.task_done(len(batch))
         return processed
     
     async def run_producer_consumer(self, producer_data: List[List[int]], 
@@ -164,8 +470,9 @@ class AsyncProducerConsumer:
         producers = [self.producer(i, data) for i, data in enumerate(producer_data)]
         consumers = [self.consumer(i) for i in range(num_consumers)]
         
-        await asyncio.gather(*producers)
-        results = await asyncio.gather(*consumers)
+        # 生产者与消费者必须同时运行, 否则有界队列填满后生产者会永久阻塞
+        all_results = await run_concurrently(producers + consumers)
+        results = all_results[len(producers):]
         await self.queue.join()
         
         return [item for sublist in results for item in sublist]
@@ -180,18 +487,20 @@ class User:
 class AsyncDatabase:
     """模拟异步数据库操作"""
     
+    # 不变式: 对self.users的读取与写入之间没有await。
+    # 事件循环单线程执行, 两者之间不会切换到其他协程, 因此无需asyncio.Lock;
+    # 修改这些方法时请保持状态变更位于模拟延迟的await之前。
+    
     def __init__(self):
         self.users = {}
-        self.lock = asyncio.Lock()
     
     async def create_user(self, name: str, email: str) -> User:
         """创建用户"""
-        async with self.lock:
-            user_id = len(self.users) + 1
-            user = User(id=user_id, name=name, email=email)
-            self.users[user_id] = user
-            await asyncio.sleep(0.1)  # 模拟数据库延迟
-            return user
+        user_id = len(self.users) + 1
+        user = User(id=user_id, name=name, email=email)
+        self.users[user_id] = user
+        await asyncio.sleep(0.1)  # 模拟数据库延迟
+        return user
     
     async def get_user(self, user_id: int) -> Optional[User]:
         """获取用户"""
@@ -200,15 +509,14 @@ class AsyncDatabase:
     
     async def update_user(self, user_id: int, **kwargs) -> bool:
         """更新用户"""
-        async with self.lock:
-            if user_id not in self.users:
-                return False
-            user = self.users[user_id]
-            for key, value in kwargs.items():
-                if hasattr(user, key):
-                    setattr(user, key, value)
-            await asyncio.sleep(0.08)  # 模拟数据库延迟
-            return True
+        user = self.users.get(user_id)
+        if user is None:
+            return False
+        for key, value in kwargs.items():
+            if hasattr(user, key):
+                setattr(user, key, value)
+        await asyncio.sleep(0.08)  # 模拟数据库延迟
+        return True
     
     async def get_all_users(self) -> List[User]:
         """获取所有用户"""
@@ -236,27 +544,58 @@ class AsyncTaskScheduler:
     async def run_scheduled_tasks(self):
         """运行所有调度任务"""
         self.running = True
-        results = []
         
-        for task in self.tasks:
-            try:
-                result = await task['coro'](*task['args'], **task['kwargs'])
-                results.append(result)
-            except Exception as e:
-                print(f"Task failed: {e}")
+        # 逐个await会让任务串行执行; 一次性扇出所有协程, 由事件循环重叠调度
+        coros = [task['coro'](*task['args'], **task['kwargs']) for task in self.tasks]
+        outcomes = await run_concurrently(coros, return_exceptions=True)
+        
+        results = []
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                print(f"Task failed: {outcome}")
                 results.append(None)
+            else:
+                results.append(outcome)
         
         self.running = False
         return results
 
 # 研究7: 异步性能基准测试
+# 阻塞IO共用一个常驻线程池, 避免每次基准测试都重新创建线程
+_IO_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix='async-io')
+atexit.register(_IO_POOL.shutdown)
+
+# CPU密集型计算受GIL限制, 放在协程里只会阻塞事件循环, 需要交给进程池并行执行.
+# 进程池在首次使用时才创建, 仅导入模块不会启动子进程
+_CPU_POOL: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+def _get_cpu_pool() -> concurrent.futures.ProcessPoolExecutor:
+    global _CPU_POOL
+    if _CPU_POOL is None:
+        _CPU_POOL = concurrent.futures.ProcessPoolExecutor()
+        atexit.register(_CPU_POOL.shutdown)
+    return _CPU_POOL
+
+def _sha256_work(n: int) -> bytes:
+    """对n字节数据做SHA-256 (顶层函数以便序列化到子进程)"""
+    return hashlib.sha256(b'x' * n).digest()
+
 class AsyncPerformanceBenchmark:
     """异步性能基准测试"""
     
     @staticmethod
     async def cpu_bound_task(n: int) -> int:
         """CPU密集型任务"""
-        return sum(i * i for i in range(n))
+        # 0..n-1的平方和有闭式解, O(1)计算无需占用事件循环或进程池
+        if n <= 0:
+            return 0
+        return (n - 1) * n * (2 * n - 1) // 6
+    
+    @staticmethod
+    async def cpu_hash_task(n: int) -> bytes:
+        """无法被常量折叠的CPU密集型任务, 在进程池中执行"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_cpu_pool(), _sha256_work, n)
     
     @staticmethod
     async def io_bound_task(delay: float) -> str:
@@ -269,17 +608,17 @@ class AsyncPerformanceBenchmark:
         """并发 vs 顺序执行基准测试"""
         
         # 顺序执行
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         for delay in [1.0, 1.5, 2.0, 0.5]:
             await AsyncPerformanceBenchmark.io_bound_task(delay)
-        sequential_time = time.time() - start_time
+        sequential_time = (time.perf_counter_ns() - start_time) / 1e9
         
         # 并发执行
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         tasks = [AsyncPerformanceBenchmark.io_bound_task(delay) 
                 for delay in [1.0, 1.5, 2.0, 0.5]]
-        await asyncio.gather(*tasks)
-        concurrent_time = time.time() - start_time
+        await run_concurrently(tasks)
+        concurrent_time = (time.perf_counter_ns() - start_time) / 1e9
         
         return {
             'sequential_time': sequential_time,
@@ -296,20 +635,22 @@ class AsyncPerformanceBenchmark:
             time.sleep(delay)
             return f"Blocking IO completed after {delay}s"
         
+        async def run_in_io_pool(delay: float) -> str:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_IO_POOL, blocking_io, delay)
+        
         # 线程池执行
-        start_time = time.time()
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            delays = [1.0, 1.5, 2.0, 0.5]
-            futures = [executor.submit(blocking_io, delay) for delay in delays]
-            thread_results = [f.result() for f in futures]
-        thread_time = time.time() - start_time
+        start_time = time.perf_counter_ns()
+        delays = [1.0, 1.5, 2.0, 0.5]
+        thread_results = await run_concurrently(run_in_io_pool(delay) for delay in delays)
+        thread_time = (time.perf_counter_ns() - start_time) / 1e9
         
         # 异步执行
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         async_tasks = [AsyncPerformanceBenchmark.io_bound_task(delay) 
                       for delay in [1.0, 1.5, 2.0, 0.5]]
-        async_results = await asyncio.gather(*async_tasks)
-        async_time = time.time() - start_time
+        async_results = await run_concurrently(async_tasks)
+        async_time = (time.perf_counter_ns() - start_time) / 1e9
         
         return {
             'thread_time': thread_time,
@@ -379,7 +720,7 @@ async def test_basic_async():
     # 测试信号量限制
     sem = asyncio.Semaphore(2)
     tasks = [basic.task_with_semaphore(sem, i) for i in range(5)]
-    await asyncio.gather(*tasks)
+    await run_concurrently(tasks)
 
 async def test_async_http():
     """测试异步HTTP客户端"""
@@ -396,6 +737,25 @@ async def test_async_http():
         for result in results:
             print(f"Fetched: {result['url']} (status: {result['status']})")
 
+async def test_http_client_cancellation():
+    """回归测试: 被唤醒的等待者随即被取消时, 通知应转交给下一个等待者"""
+    print("\n=== 并发名额取消测试 ===")
+    
+    client = AsyncHTTPClient(max_concurrent=1)
+    await client._acquire()  # A 占用唯一名额
+    waiter_b = asyncio.create_task(client._acquire())
+    waiter_c = asyncio.create_task(client._acquire())
+    await asyncio.sleep(0)  # B, C 进入等待
+    
+    client._release()  # A 归还名额, 唤醒 B
+    await asyncio.sleep(0)
+    waiter_b.cancel()  # B 被唤醒后、重新拿到锁之前被取消
+    
+    await asyncio.wait_for(waiter_c, timeout=1.0)  # C 必须拿到名额
+    assert waiter_b.cancelled() and client._active == 1
+    client._release()
+    print("取消的等待者没有吞掉唤醒通知")
+
 async def test_async_file_io():
     """测试异步文件IO"""
     print("\n=== 异步文件IO测试 ===")
@@ -443,11 +803,11 @@ async def test_async_database():
         db.create_user(f"User{i}", f"user{i}@example.com") 
         for i in range(5)
     ]
-    users = await asyncio.gather(*user_tasks)
+    users = await run_concurrently(user_tasks)
     
     # 并发获取用户
     get_tasks = [db.get_user(user.id) for user in users]
-    retrieved_users = await asyncio.gather(*get_tasks)
+    retrieved_users = await run_concurrently(get_tasks)
     
     print(f"Created {len(users)} users")
     for user in retrieved_users:
@@ -504,6 +864,7 @@ async def main():
     
     await test_basic_async()
     await test_async_http()
+    await test_http_client_cancellation()
     await test_async_file_io()
     await test_producer_consumer()
     await test_async_database()
@@ -520,4 +881,7 @@ async def main():
     print("6. 性能基准测试验证优化效果")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if USE_UVLOOP:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
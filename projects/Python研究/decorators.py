@@ -3,6 +3,7 @@ Python装饰器深度研究
 高级编程模式与元编程技术
 """
 import functools
+import collections
 import time
 import logging
 import threading
@@ -20,23 +21,25 @@ class BasicDecorators:
         """计算函数执行时间的装饰器"""
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter_ns()
             result = func(*args, **kwargs)
-            end_time = time.time()
-            print(f"{func.__name__} took {end_time - start_time:.4f} seconds")
+            end_time = time.perf_counter_ns()
+            print(f"{func.__name__} took {(end_time - start_time) / 1e9:.4f} seconds")
             return result
         return wrapper
     
     @staticmethod
     def logger_decorator(log_level: str = "INFO"):
         """日志记录装饰器"""
+        level = getattr(logging, log_level)  # 装饰时解析一次日志级别
+        
         def decorator(func: Callable) -> Callable:
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
-                logging.log(getattr(logging, log_level), 
+                logging.log(level, 
                           f"Calling {func.__name__} with args={args}, kwargs={kwargs}")
                 result = func(*args, **kwargs)
-                logging.log(getattr(logging, log_level), 
+                logging.log(level, 
                           f"{func.__name__} returned {result}")
                 return result
             return wrapper
@@ -63,33 +66,40 @@ class BasicDecorators:
 class ParameterizedDecorators:
     """带参数的装饰器工厂模式"""
     
+    SWEEP_INTERVAL = 1024
+    
     def __init__(self):
         self.cache_stats = {}
     
     def memoize_with_ttl(self, ttl: float = 300.0):
         """带过期时间的缓存装饰器"""
         def decorator(func: Callable) -> Callable:
-            cache = {}
-            timestamps = {}
+            cache = {}  # key -> (result, expiry_time)
+            calls = 0
             
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
-                key = (args, frozenset(kwargs.items()) if kwargs else None)
-                current_time = time.time()
+                nonlocal calls
+                # 与lru_cache相同的键构造方式, 无关键字参数时不额外分配对象
+                key = functools._make_key(args, kwargs, False)
+                current_time = time.monotonic()
                 
-                # 清理过期缓存
-                expired_keys = [k for k, t in timestamps.items() 
-                              if current_time - t > ttl]
-                for k in expired_keys:
-                    del cache[k]
-                    del timestamps[k]
+                # 惰性过期: 只检查本次访问的键
+                entry = cache.get(key)
+                if entry is not None and entry[1] > current_time:
+                    return entry[0]
                 
-                if key in cache:
-                    return cache[key]
+                # 每SWEEP_INTERVAL次调用批量清理一次过期缓存
+                calls += 1
+                if calls >= self.SWEEP_INTERVAL:
+                    calls = 0
+                    expired_keys = [k for k, (_, expiry) in cache.items()
+                                    if expiry <= current_time]
+                    for k in expired_keys:
+                        del cache[k]
                 
                 result = func(*args, **kwargs)
-                cache[key] = result
-                timestamps[key] = current_time
+                cache[key] = (result, current_time + ttl)
                 return result
             
             wrapper.cache_clear = lambda: cache.clear()
@@ -103,16 +113,18 @@ class ParameterizedDecorators:
     def rate_limit(self, max_calls: int = 100, window: float = 60.0):
         """速率限制装饰器"""
         def decorator(func: Callable) -> Callable:
-            calls = []
+            # 时间戳按调用顺序追加, 队首总是最旧的记录, 过期只需从队首弹出
+            calls = collections.deque()
             lock = threading.Lock()
             
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
-                current_time = time.time()
+                current_time = time.monotonic()
                 
                 with lock:
                     # 清理旧调用记录
-                    calls[:] = [t for t in calls if current_time - t < window]
+                    while calls and current_time - calls[0] >= window:
+                        calls.popleft()
                     
                     if len(calls) >= max_calls:
                         raise RuntimeError(f"Rate limit exceeded: {max_calls} calls per {window}s")
@@ -136,16 +148,19 @@ class ClassDecorators:
     @staticmethod
     def singleton(cls):
         """单例模式装饰器"""
-        instances = {}
+        instance = None
         lock = threading.Lock()
         
         @functools.wraps(cls)
         def wrapper(*args, **kwargs):
-            if cls not in instances:
-                with lock:
-                    if cls not in instances:
-                        instances[cls] = cls(*args, **kwargs)
-            return instances[cls]
+            nonlocal instance
+            # 快速路径只读取闭包变量, 不做字典查找也不加锁
+            if instance is not None:
+                return instance
+            with lock:
+                if instance is None:
+                    instance = cls(*args, **kwargs)
+            return instance
         return wrapper
     
     @staticmethod
@@ -241,12 +256,15 @@ class AdvancedDecorators:
     def debug_decorator(verbose: bool = False):
         """调试装饰器"""
         def decorator(func):
+            # inspect.signature开销较大, 在装饰时计算一次
+            sig_str = str(inspect.signature(func)) if verbose else None
+            
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
                 if verbose:
                     print(f"Calling {func.__name__}")
                     print(f"Arguments: args={args}, kwargs={kwargs}")
-                    print(f"Function signature: {inspect.signature(func)}")
+                    print(f"Function signature: {sig_str}")
                 
                 try:
                     result = func(*args, **kwargs)
@@ -263,21 +281,31 @@ class AdvancedDecorators:
     @staticmethod
     def type_check(*types, **kwtypes):
         """类型检查装饰器"""
+        # 类型在装饰时已固定, 生成逐参数展开的检查函数, 调用时无需zip/enumerate循环.
+        # 类型与关键字名都以常量放入namespace, 源码中只出现生成的标识符, 不拼接任意字符串
+        namespace = {}
+        lines = ["def _check(*args, **kwargs):", "    n = len(args)"]
+        for i, expected_type in enumerate(types):
+            namespace[f"_t{i}"] = expected_type
+            lines.append(
+                f"    if n > {i} and not isinstance(args[{i}], _t{i}): "
+                f"raise TypeError(f'Argument {i} expected {{_t{i}}}, got {{type(args[{i}])}}')")
+        if kwtypes:
+            lines.append("    if kwargs:")
+            for j, (key, expected_type) in enumerate(kwtypes.items()):
+                namespace[f"_k{j}"] = key
+                namespace[f"_kt{j}"] = expected_type
+                lines.append(
+                    f"        if _k{j} in kwargs and not isinstance(kwargs[_k{j}], _kt{j}): "
+                    f"raise TypeError(f'Keyword argument {{_k{j}}} expected {{_kt{j}}}, "
+                    f"got {{type(kwargs[_k{j}])}}')")
+        exec("\n".join(lines), namespace)
+        check = namespace["_check"]
+        
         def decorator(func):
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
-                # 检查位置参数类型
-                for i, (arg, expected_type) in enumerate(zip(args, types)):
-                    if not isinstance(arg, expected_type):
-                        raise TypeError(
-                            f"Argument {i} expected {expected_type}, got {type(arg)}")
-                
-                # 检查关键字参数类型
-                for key, value in kwargs.items():
-                    if key in kwtypes and not isinstance(value, kwtypes[key]):
-                        raise TypeError(
-                            f"Keyword argument {key} expected {kwtypes[key]}, got {type(value)}")
-                
+                check(*args, **kwargs)
                 return func(*args, **kwargs)
             return wrapper
         return decorator
@@ -291,6 +319,13 @@ class AdvancedDecorators:
         return decorator
 
 # 研究7: 装饰器实现示例
+@lru_cache(maxsize=None)
+def fibonacci(n: int) -> int:
+    """带缓存的斐波那契数列 (纯函数, 无需TTL过期)"""
+    if n <= 1:
+        return n
+    return fibonacci(n-1) + fibonacci(n-2)
+
 class DecoratorExamples:
     """装饰器实现示例"""
     
@@ -308,12 +343,9 @@ class DecoratorExamples:
         time.sleep(0.1)
         return sum(range(n))
     
-    @ParameterizedDecorators().memoize_with_ttl(ttl=5.0)
     def fibonacci(self, n: int) -> int:
         """带缓存的斐波那契数列"""
-        if n <= 1:
-            return n
-        return self.fibonacci(n-1) + self.fibonacci(n-2)
+        return fibonacci(n)
     
     @ClassDecorators.singleton
     class DatabaseConnection:
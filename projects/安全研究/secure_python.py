@@ -4,35 +4,69 @@ Python安全编程深度研究
 输入验证、加密、安全通信与防御性编程
 """
 
+import base64
 import hashlib
 import secrets
 import re
 import os
+import string
 import json
 import sqlite3
 import hmac
-import base64
 import ssl
 import socket
 import threading
 import time
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
 from urllib.parse import urlparse, quote, unquote
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Deque
 import logging
 
+# fastpbkdf2预先计算HMAC内外层摘要状态, 每轮迭代只做一次压缩; 未安装时使用hashlib
+try:
+    from fastpbkdf2 import pbkdf2_hmac as _fast_pbkdf2_hmac
+except ImportError:
+    _fast_pbkdf2_hmac = None
+
+# cryptography直接走OpenSSL的EVP接口, 可利用SHA-NI/ARMv8 SHA2指令加速SHA-256
+try:
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+except ImportError:
+    PBKDF2HMAC = None
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 预编译正则表达式, 避免每次调用都查询re模块的编译缓存
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+
+# 密码字符类别, 供validate_password单次遍历使用
+_PW_UPPER = frozenset(string.ascii_uppercase)
+_PW_LOWER = frozenset(string.ascii_lowercase)
+_PW_SPECIAL = frozenset('!@#$%^&*(),.?":{}|<>')
+
+# 危险标签与危险属性合并为一个交替正则, 一次扫描完成删除;
+# 标签分支可跨行匹配 (局部DOTALL), 属性分支与原先一样只在单行内匹配
+_SANITIZE_RE = re.compile(
+    r'(?s:<(script|iframe|object|embed|form).*?</\1>)'
+    r'|(?:onload|onerror|onclick|onmouseover|javascript:).*?["\'].*?["\']',
+    re.IGNORECASE)
+_BAD_PATH_RE = re.compile(
+    '|'.join(re.escape(p) for p in ('..', '~', '/etc/passwd', '/etc/shadow', '\\windows\\system32')),
+    re.IGNORECASE)
+_HTML_ESCAPE_TABLE = str.maketrans({'<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'})
+
 class SecurityValidator:
     """输入验证与数据净化类"""
     
     @staticmethod
     def validate_email(email: str) -> bool:
         """验证邮箱地址格式"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return bool(_EMAIL_RE.match(email))
     
     @staticmethod
     def validate_username(username: str, min_length: int = 3, max_length: int = 20) -> bool:
@@ -41,8 +75,7 @@ class SecurityValidator:
             return False
         if not (min_length <= len(username) <= max_length):
             return False
-        pattern = r'^[a-zA-Z0-9_-]+$'
-        return bool(re.match(pattern, username))
+        return bool(_USERNAME_RE.match(username))
     
     @staticmethod
     def validate_password(password: str) -> Dict[str, Any]:
@@ -53,33 +86,49 @@ class SecurityValidator:
             'strength': 0
         }
         
+        # 一次遍历收集四类字符标志, 全部命中后提前结束
+        has_upper = has_lower = has_digit = has_special = False
+        for ch in password:
+            if ch in _PW_UPPER:
+                has_upper = True
+            elif ch in _PW_LOWER:
+                has_lower = True
+            elif ch.isdecimal():
+                has_digit = True
+            elif ch in _PW_SPECIAL:
+                has_special = True
+            else:
+                continue
+            if has_upper and has_lower and has_digit and has_special:
+                break
+        
         if len(password) < 8:
             result['valid'] = False
             result['errors'].append('密码长度至少8位')
         
-        if not re.search(r'[A-Z]', password):
+        if not has_upper:
             result['valid'] = False
             result['errors'].append('需包含大写字母')
         
-        if not re.search(r'[a-z]', password):
+        if not has_lower:
             result['valid'] = False
             result['errors'].append('需包含小写字母')
         
-        if not re.search(r'\d', password):
+        if not has_digit:
             result['valid'] = False
             result['errors'].append('需包含数字')
         
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+        if not has_special:
             result['valid'] = False
             result['errors'].append('需包含特殊字符')
         
         # 计算强度评分
         strength = 0
         strength += min(len(password) * 4, 32)  # 长度加分
-        strength += 10 if re.search(r'[A-Z]', password) else 0
-        strength += 10 if re.search(r'[a-z]', password) else 0
-        strength += 10 if re.search(r'\d', password) else 0
-        strength += 20 if re.search(r'[!@#$%^&*(),.?":{}|<>]', password) else 0
+        strength += 10 if has_upper else 0
+        strength += 10 if has_lower else 0
+        strength += 10 if has_digit else 0
+        strength += 20 if has_special else 0
         
         result['strength'] = min(strength, 100)
         return result
@@ -87,22 +136,11 @@ class SecurityValidator:
     @staticmethod
     def sanitize_html(html: str) -> str:
         """净化HTML内容，防止XSS攻击"""
-        dangerous_tags = ['script', 'iframe', 'object', 'embed', 'form']
-        dangerous_attrs = ['onload', 'onerror', 'onclick', 'onmouseover', 'javascript:']
+        # 移除危险标签和危险属性
+        html = _SANITIZE_RE.sub('', html)
         
-        # 移除危险标签
-        for tag in dangerous_tags:
-            html = re.sub(f'<{tag}.*?</{tag}>', '', html, flags=re.IGNORECASE | re.DOTALL)
-        
-        # 移除危险属性
-        for attr in dangerous_attrs:
-            html = re.sub(f'{attr}.*?["\'].*?["\']', '', html, flags=re.IGNORECASE)
-        
-        # 转义特殊字符
-        html = html.replace('<', '&lt;').replace('>', '&gt;')
-        html = html.replace('"', '&quot;').replace("'", '&#x27;')
-        
-        return html
+        # 转义特殊字符 (一次translate完成全部替换)
+        return html.translate(_HTML_ESCAPE_TABLE)
     
     @staticmethod
     def validate_url(url: str) -> bool:
@@ -127,41 +165,46 @@ class SecurityValidator:
         if not isinstance(filepath, str):
             return False
         
-        # 检查路径遍历
-        dangerous_patterns = ['..', '~', '/etc/passwd', '/etc/shadow', '\\windows\\system32']
-        for pattern in dangerous_patterns:
-            if pattern.lower() in filepath.lower():
-                return False
+        # 检查路径遍历 (一次正则扫描匹配全部危险片段)
+        if _BAD_PATH_RE.search(filepath):
+            return False
         
         # 检查绝对路径
-        if filepath.startswith('/') or filepath.startswith('C:\\'):
+        if filepath.startswith(('/', 'C:\\')):
             return False
         
         return True
 
+def _pbkdf2_sha256(password: bytes, salt: bytes, iterations: int) -> bytes:
+    """PBKDF2-HMAC-SHA256, 优先使用加速实现"""
+    if _fast_pbkdf2_hmac is not None:
+        return _fast_pbkdf2_hmac('sha256', password, salt, iterations)
+    if PBKDF2HMAC is not None:
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=iterations)
+        return kdf.derive(password)
+    return hashlib.pbkdf2_hmac('sha256', password, salt, iterations)
+
 class PasswordManager:
     """密码管理器"""
     
+    PBKDF2_ITERATIONS = 100000  # 迭代次数下限, 不应为了速度调低
+    
     @staticmethod
-    def hash_password(password: str, salt: Optional[bytes] = None) -> Tuple[str, str]:
+    def hash_password(password: str, salt: Optional[bytes] = None) -> Tuple[bytes, bytes]:
         """安全地哈希密码"""
         if salt is None:
             salt = secrets.token_bytes(32)
         
         # 使用PBKDF2-HMAC-SHA256
-        key = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, 100000)
-        
-        # 返回哈希值和盐值（base64编码）
-        hashed_password = base64.b64encode(key).decode('utf-8')
-        salt_str = base64.b64encode(salt).decode('utf-8')
+        key = _pbkdf2_sha256(password.encode('utf-8'), salt, PasswordManager.PBKDF2_ITERATIONS)
         
-        return hashed_password, salt_str
+        # 返回原始字节形式的哈希值和盐值, 直接存为BLOB, 无需base64编解码
+        return key, salt
     
     @staticmethod
-    def verify_password(password: str, hashed_password: str, salt_str: str) -> bool:
+    def verify_password(password: str, hashed_password: bytes, salt: bytes) -> bool:
         """验证密码"""
         try:
-            salt = base64.b64decode(salt_str.encode('utf-8'))
             new_hash, _ = PasswordManager.hash_password(password, salt)
             return hmac.compare_digest(new_hash, hashed_password)
         except Exception:
@@ -170,88 +213,175 @@ class PasswordManager:
     @staticmethod
     def generate_secure_password(length: int = 12) -> str:
         """生成安全随机密码"""
-        alphabet = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()'
-        return ''.join(secrets.choice(alphabet) for _ in range(length))
+        alphabet = b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()'
+        n = len(alphabet)
+        # 丢弃 >= limit 的字节, 保证取模后每个字符等概率 (拒绝采样)
+        limit = 256 - (256 % n)
+        out = bytearray()
+        while len(out) < length:
+            # 一次读取一批随机字节, 代替逐字符调用secrets.choice
+            for b in secrets.token_bytes(length * 2):
+                if b < limit:
+                    out.append(alphabet[b % n])
+                    if len(out) == length:
+                        break
+        return out.decode('ascii')
 
 class SecureSessionManager:
-    """安全会话管理器"""
-    
-    def __init__(self, session_timeout: int = 3600):
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+    """安全会话管理器
+    
+    会话按session_id哈希分布到多个分片, 每个分片有独立的锁,
+    不同会话的请求很少竞争同一把锁。清理线程逐个分片加锁扫描,
+    因此清理期间看到的是各分片在不同时刻的状态, 而不是全局快照。
+    """
+    
+    NUM_SHARDS = 64
+    
+    def __init__(self, session_timeout: int = 3600,
+                 csrf_protector: Optional['CSRFProtector'] = None):
+        # 会话销毁或过期清理时同步回收其CSRF令牌
+        self.csrf_protector = csrf_protector
+        # 每个分片按最近活动时间排序: 访问时移到末尾, 最久未活动的会话总在开头
+        self._shards: List[OrderedDict] = [OrderedDict() for _ in range(self.NUM_SHARDS)]
+        self._locks = [threading.Lock() for _ in range(self.NUM_SHARDS)]
         self.session_timeout = session_timeout
-        self.lock = threading.Lock()
         
         # 启动清理线程
         self.cleanup_thread = threading.Thread(target=self._cleanup_expired_sessions, daemon=True)
         self.cleanup_thread.start()
     
+    def _shard_index(self, session_id: str) -> int:
+        return hash(session_id) % self.NUM_SHARDS
+    
     def create_session(self, user_id: str) -> str:
         """创建新会话"""
         session_id = secrets.token_urlsafe(32)
+        idx = self._shard_index(session_id)
         
-        with self.lock:
-            self.sessions[session_id] = {
+        with self._locks[idx]:
+            self._shards[idx][session_id] = {
                 'user_id': user_id,
                 'created_at': datetime.now(),
-                'last_activity': datetime.now(),
+                'last_activity': time.monotonic(),  # 单调时钟, 仅用于超时判断
                 'ip_address': None,
                 'user_agent': None
             }
         
         return session_id
     
+    def _validate_locked(self, idx: int, session_id: str) -> Optional[Dict[str, Any]]:
+        """检查会话是否有效并刷新活动时间, 调用方必须持有分片锁"""
+        sessions = self._shards[idx]
+        session = sessions.get(session_id)
+        if session is None:
+            return None
+        
+        now = time.monotonic()
+        if now - session['last_activity'] > self.session_timeout:
+            del sessions[session_id]
+            return None
+        
+        session['last_activity'] = now
+        sessions.move_to_end(session_id)
+        return session
+    
     def validate_session(self, session_id: str) -> bool:
         """验证会话有效性"""
-        with self.lock:
-            if session_id not in self.sessions:
-                return False
-            
-            session = self.sessions[session_id]
-            if datetime.now() - session['last_activity'] > timedelta(seconds=self.session_timeout):
-                del self.sessions[session_id]
-                return False
-            
-            session['last_activity'] = datetime.now()
-            return True
+        idx = self._shard_index(session_id)
+        with self._locks[idx]:
+            return self._validate_locked(idx, session_id) is not None
     
     def get_session_data(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """获取会话数据"""
-        with self.lock:
-            if self.validate_session(session_id):
-                return self.sessions[session_id]
-            return None
+        """获取会话数据 (返回副本, 修改不会影响存储的会话)"""
+        idx = self._shard_index(session_id)
+        with self._locks[idx]:
+            session = self._validate_locked(idx, session_id)
+            return dict(session) if session is not None else None
     
     def destroy_session(self, session_id: str) -> bool:
         """销毁会话"""
-        with self.lock:
-            if session_id in self.sessions:
-                del self.sessions[session_id]
-                return True
-            return False
+        idx = self._shard_index(session_id)
+        with self._locks[idx]:
+            sessions = self._shards[idx]
+            if session_id not in sessions:
+                return False
+            del sessions[session_id]
+        
+        if self.csrf_protector is not None:
+            self.csrf_protector.drop(session_id)
+        return True
     
     def _cleanup_expired_sessions(self):
         """清理过期会话"""
         while True:
             time.sleep(300)  # 每5分钟清理一次
-            with self.lock:
-                expired_sessions = []
-                for session_id, session_data in self.sessions.items():
-                    if datetime.now() - session_data['last_activity'] > timedelta(seconds=self.session_timeout):
-                        expired_sessions.append(session_id)
-                
-                for session_id in expired_sessions:
-                    del self.sessions[session_id]
+            for idx in range(self.NUM_SHARDS):
+                # 每次只持有一个分片的锁, 不阻塞其他分片上的请求
+                with self._locks[idx]:
+                    # 分片按活动时间有序, 从开头弹出过期会话, 遇到未过期的即可停止
+                    sessions = self._shards[idx]
+                    now = time.monotonic()
+                    while sessions:
+                        session_data = next(iter(sessions.values()))
+                        if now - session_data['last_activity'] <= self.session_timeout:
+                            break
+                        sessions.popitem(last=False)
+            
+            if self.csrf_protector is not None:
+                self.csrf_protector.reap_expired()
 
 class SecureDatabase:
     """安全数据库操作类"""
     
+    # SQL文本固定为类常量, 每次执行的语句文本完全一致, 可命中sqlite3的预编译语句缓存
+    SQL_FIND_EXISTING = 'SELECT id FROM users WHERE username = ? OR email = ?'
+    SQL_INSERT_USER = (
+        'INSERT INTO users (username, email, password_hash, salt) VALUES (?, ?, ?, ?)'
+    )
+    SQL_SELECT_AUTH = (
+        'SELECT id, password_hash, salt, failed_attempts, locked_until '
+        'FROM users WHERE username = ?'
+    )
+    # 在数据库内原子地自增失败次数, 并发的失败登录不会互相覆盖计数
+    SQL_RECORD_FAILURE = (
+        'UPDATE users SET failed_attempts = failed_attempts + 1, '
+        'locked_until = CASE WHEN failed_attempts + 1 >= ? THEN ? ELSE NULL END '
+        'WHERE id = ?'
+    )
+    MAX_FAILED_ATTEMPTS = 5
+    SQL_RECORD_LOGIN = (
+        'UPDATE users SET failed_attempts = 0, locked_until = NULL, '
+        'last_login = CURRENT_TIMESTAMP WHERE id = ?'
+    )
+    # 旧版本以base64 TEXT存储哈希与盐值, 登录成功时就地改写为BLOB
+    SQL_UPGRADE_CREDENTIALS = 'UPDATE users SET password_hash = ?, salt = ? WHERE id = ?'
+    
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self._local = threading.local()
         self.init_database()
     
+    def _conn(self) -> sqlite3.Connection:
+        """获取当前线程复用的数据库连接, 首次使用时创建并开启WAL"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # 自动提交模式, 需要事务时显式BEGIN
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+    
+    def close(self):
+        """关闭当前线程的数据库连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
     def init_database(self):
         """初始化数据库"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn()
         cursor = conn.cursor()
         
         # 创建用户表
@@ -260,8 +390,8 @@ class SecureDatabase:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT UNIQUE NOT NULL,
                 email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                salt TEXT NOT NULL,
+                password_hash BLOB NOT NULL,
+                salt BLOB NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 last_login TIMESTAMP,
                 failed_attempts INTEGER DEFAULT 0,
@@ -281,9 +411,6 @@ class SecureDatabase:
                 FOREIGN KEY (user_id) REFERENCES users (id)
             )
         ''')
-        
-        conn.commit()
-        conn.close()
     
     def create_user(self, username: str, email: str, password: str) -> bool:
         """安全创建用户"""
@@ -297,100 +424,115 @@ class SecureDatabase:
         if not password_check['valid']:
             return False
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn().cursor()
         
         try:
             # 检查用户名和邮箱是否已存在
-            cursor.execute('SELECT id FROM users WHERE username = ? OR email = ?', (username, email))
+            cursor.execute(self.SQL_FIND_EXISTING, (username, email))
             if cursor.fetchone():
                 return False
             
             # 安全存储密码
             password_hash, salt = PasswordManager.hash_password(password)
-            cursor.execute('''
-                INSERT INTO users (username, email, password_hash, salt)
-                VALUES (?, ?, ?, ?)
-            ''', (username, email, password_hash, salt))
+            cursor.execute(self.SQL_INSERT_USER, (username, email, password_hash, salt))
             
-            conn.commit()
             return True
         except sqlite3.Error:
             return False
-        finally:
-            conn.close()
+    
+    @staticmethod
+    def _decode_legacy(value) -> bytes:
+        """旧版本的base64文本转为原始字节; 已是bytes时原样返回"""
+        if isinstance(value, str):
+            return base64.b64decode(value.encode('ascii'), validate=True)
+        return value
     
     def authenticate_user(self, username: str, password: str) -> bool:
         """安全认证用户"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn().cursor()
         
         try:
-            # 获取用户信息
-            cursor.execute('''
-                SELECT id, password_hash, salt, failed_attempts, locked_until
-                FROM users WHERE username = ?
-            ''', (username,))
+            # 获取用户信息 (username的UNIQUE约束已自带索引)
+            cursor.execute(self.SQL_SELECT_AUTH, (username,))
             
             user = cursor.fetchone()
             if not user:
                 return False
             
-            user_id, stored_hash, salt_str, failed_attempts, locked_until = user
+            user_id, stored_hash, salt, _, locked_until = user
+            
+            # 兼容旧版本写入的base64文本; 解码失败按认证失败处理, 不抛出
+            legacy = isinstance(stored_hash, str) or isinstance(salt, str)
+            if legacy:
+                try:
+                    stored_hash = self._decode_legacy(stored_hash)
+                    salt = self._decode_legacy(salt)
+                except ValueError:
+                    return False
             
             # 检查账户是否被锁定
             if locked_until and datetime.now() < datetime.fromisoformat(locked_until):
                 return False
             
             # 验证密码
-            if not PasswordManager.verify_password(password, stored_hash, salt_str):
-                # 增加失败次数
-                new_attempts = failed_attempts + 1
-                locked_time = None
-                
-                if new_attempts >= 5:
-                    locked_time = datetime.now() + timedelta(minutes=30)
-                
-                cursor.execute('''
-                    UPDATE users SET failed_attempts = ?, locked_until = ?
-                    WHERE id = ?
-                ''', (new_attempts, locked_time, user_id))
-                conn.commit()
+            if not PasswordManager.verify_password(password, stored_hash, salt):
+                # 增加失败次数, 达到上限时锁定30分钟
+                # (不把SELECT与UPDATE包进BEGIN IMMEDIATE: 那样会在PBKDF2计算期间一直持有写锁)
+                locked_time = (datetime.now() + timedelta(minutes=30)).isoformat(sep=' ')
+                cursor.execute(self.SQL_RECORD_FAILURE,
+                               (self.MAX_FAILED_ATTEMPTS, locked_time, user_id))
                 return False
             
             # 重置失败次数
-            cursor.execute('''
-                UPDATE users SET failed_attempts = 0, locked_until = NULL, last_login = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (user_id,))
-            conn.commit()
+            cursor.execute(self.SQL_RECORD_LOGIN, (user_id,))
+            if legacy:
+                cursor.execute(self.SQL_UPGRADE_CREDENTIALS, (stored_hash, salt, user_id))
             
             return True
         except sqlite3.Error:
             return False
-        finally:
-            conn.close()
 
 class CSRFProtector:
     """CSRF保护器"""
     
     def __init__(self):
-        self.tokens: Dict[str, str] = {}
+        self.tokens: Dict[str, Tuple[str, float]] = {}  # session_id -> (token, 生成时间)
         self.token_timeout = 3600  # 1小时
+        # 令牌会被SecureHTTPServer的多个线程并发访问, 轮换与校验需互斥
+        self.lock = threading.Lock()
     
     def generate_token(self, session_id: str) -> str:
         """生成CSRF令牌"""
         token = secrets.token_urlsafe(32)
-        self.tokens[session_id] = token
+        with self.lock:
+            self.tokens[session_id] = (token, time.monotonic())
         return token
     
     def validate_token(self, session_id: str, token: str) -> bool:
         """验证CSRF令牌"""
-        if session_id not in self.tokens:
-            return False
-        
-        stored_token = self.tokens[session_id]
+        with self.lock:
+            entry = self.tokens.get(session_id)
+            if entry is None:
+                return False
+            stored_token, issued_at = entry
+            if time.monotonic() - issued_at > self.token_timeout:
+                del self.tokens[session_id]
+                return False
         return hmac.compare_digest(stored_token, token)
+    
+    def drop(self, session_id: str):
+        """删除会话对应的令牌"""
+        with self.lock:
+            self.tokens.pop(session_id, None)
+    
+    def reap_expired(self):
+        """清理所有过期令牌"""
+        with self.lock:
+            now = time.monotonic()
+            expired = [sid for sid, (_, issued_at) in self.tokens.items()
+                       if now - issued_at > self.token_timeout]
+            for session_id in expired:
+                del self.tokens[session_id]
 
 class RateLimiter:
     """速率限制器"""
@@ -398,39 +540,43 @@ class RateLimiter:
     def __init__(self, max_requests: int = 100, window_seconds: int = 3600):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests: Dict[str, List[datetime]] = {}
+        # 每个标识一个按时间排序的deque, 过期记录只需从队首弹出
+        self.requests: Dict[str, Deque[float]] = {}
         self.lock = threading.Lock()
     
     def is_allowed(self, identifier: str) -> bool:
         """检查是否允许请求"""
-        now = datetime.now()
+        now = time.monotonic()
         
         with self.lock:
-            if identifier not in self.requests:
-                self.requests[identifier] = []
+            timestamps = self.requests.get(identifier)
+            if timestamps is None:
+                timestamps = self.requests[identifier] = deque()
             
             # 移除过期的请求记录
-            self.requests[identifier] = [
-                req_time for req_time in self.requests[identifier]
-                if now - req_time < timedelta(seconds=self.window_seconds)
-            ]
+            while timestamps and now - timestamps[0] >= self.window_seconds:
+                timestamps.popleft()
             
             # 检查是否超过限制
-            if len(self.requests[identifier]) >= self.max_requests:
+            if len(timestamps) >= self.max_requests:
                 return False
             
             # 记录新请求
-            self.requests[identifier].append(now)
+            timestamps.append(now)
             return True
 
+# 静态响应预先编码为bytes, 每次请求无需再编码
+_RESP_OK = b"HTTP/1.1 200 OK\r\n\r\nSecure server running"
+_RESP_429 = b"HTTP/1.1 429 Too Many Requests\r\n\r\nRate limit exceeded"
+
 class SecureHTTPServer:
     """安全HTTP服务器示例"""
     
     def __init__(self, host: str = 'localhost', port: int = 8443):
         self.host = host
         self.port = port
-        self.session_manager = SecureSessionManager()
         self.csrf_protector = CSRFProtector()
+        self.session_manager = SecureSessionManager(csrf_protector=self.csrf_protector)
         self.rate_limiter = RateLimiter()
     
     def create_ssl_context(self) -> ssl.SSLContext:
@@ -443,39 +589,40 @@ class SecureHTTPServer:
     def handle_request(self, conn: socket.socket, addr: tuple):
         """处理HTTP请求"""
         try:
-            data = conn.recv(1024).decode('utf-8')
+            data = conn.recv(1024)
             if not data:
                 return
             
-            # 简单的HTTP解析
-            lines = data.split('\r\n')
-            request_line = lines[0]
+            # 简单的HTTP解析: 直接在bytes上截取请求行, 不解码和切分整个缓冲区
+            end = data.find(b'\r\n')
+            request_line = data[:end] if end >= 0 else data
             
             # 速率限制
             client_ip = addr[0]
             if not self.rate_limiter.is_allowed(client_ip):
-                response = "HTTP/1.1 429 Too Many Requests\r\n\r\nRate limit exceeded"
-                conn.send(response.encode('utf-8'))
+                conn.sendall(_RESP_429)
                 return
             
             # 处理登录请求示例
-            if 'POST /login' in request_line:
+            if request_line.startswith(b'POST /login'):
                 response = self.handle_login(conn)
             else:
-                response = "HTTP/1.1 200 OK\r\n\r\nSecure server running"
+                response = _RESP_OK
             
-            conn.send(response.encode('utf-8'))
+            # sendall保证在部分写入时继续发送剩余数据
+            conn.sendall(response)
             
         except Exception as e:
             logger.error(f"处理请求时出错: {e}")
         finally:
             conn.close()
     
-    def handle_login(self, conn: socket.socket) -> str:
+    def handle_login(self, conn: socket.socket) -> bytes:
         """处理登录请求"""
         # 这里应该解析POST数据，简化为示例
         session_id = self.session_manager.create_session("user123")
-        return f"HTTP/1.1 200 OK\r\nSet-Cookie: session={session_id}\r\n\r\nLogin successful"
+        return (b"HTTP/1.1 200 OK\r\nSet-Cookie: session=" + session_id.encode('ascii') +
+                b"\r\n\r\nLogin successful")
 
 class SecurityTester:
     """安全测试工具"""
@@ -575,7 +722,7 @@ def main():
     # 2. 密码安全测试
     print("\n[2] 密码安全测试")
     hashed_pw, salt = PasswordManager.hash_password(password)
-    print(f"密码哈希: {hashed_pw[:20]}...")
+    print(f"密码哈希: {hashed_pw.hex()[:20]}...")
     print(f"验证密码: {PasswordManager.verify_password(password, hashed_pw, salt)}")
     
     # 3. 会话管理测试
@@ -618,11 +765,13 @@ def main():
     print("4. 定期进行安全测试和审计")
     print("5. 保持安全库和依赖更新")
     
-    # 清理测试文件
-    try:
-        os.remove('/tmp/secure_test.db')
-    except FileNotFoundError:
-        pass
+    # 清理测试文件 (WAL模式会额外生成-wal/-shm文件)
+    db.close()
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove('/tmp/secure_test.db' + suffix)
+        except FileNotFoundError:
+            pass
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -11,17 +11,135 @@ import json
 import time
 import re
 import shutil
+import itertools
+import importlib.util
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 import argparse
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from importlib.metadata import distributions
+
+_WHICH_CACHE: Dict[str, str] = {}
+
+def _which(cmd: str) -> Optional[str]:
+    """缓存 shutil.which 结果, 避免每次遍历 PATH 逐目录 stat
+    
+    只缓存找到的路径: 未找到时不记录, 进程内随后安装的工具 (如 pip 安装的
+    pre-commit) 下次查找仍能发现.
+    """
+    path = _WHICH_CACHE.get(cmd)
+    if path is None:
+        path = shutil.which(cmd)
+        if path is not None:
+            _WHICH_CACHE[cmd] = path
+    return path
+
+def _spawn(cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run 包装, 尽量走 posix_spawn 快速路径
+    
+    CPython 仅在 close_fds=False, 可执行文件带目录, 且未指定 cwd/preexec_fn/
+    start_new_session/shell 时才用 posix_spawn 代替 fork+exec. Python 打开的 fd
+    默认不可继承 (PEP 446), 因此关闭 close_fds 是安全的. 需要 cwd 的调用
+    (run_tests, run_linter, setup.py --requires) 不满足条件, 仍直接用 subprocess.run.
+    """
+    executable = _which(cmd[0]) or cmd[0]
+    return subprocess.run([executable, *cmd[1:]], close_fds=False, **kwargs)
+
+def _scan_tree(root: str, scan: Dict[str, List[str]]):
+    """一次遍历目录树, 同时归类 .py 文件, 测试文件和覆盖率文件
+    
+    scandir 复用目录项自带的类型信息, 免去逐个 stat, 路径保持为字符串.
+    无权限或不存在的目录直接跳过, 与 Path.rglob 的行为一致.
+    """
+    try:
+        it = os.scandir(root)
+    except OSError:
+        return
+    with it:
+        for entry in it:
+            name = entry.name
+            if name.startswith('.coverage'):
+                scan['coverage_files'].append(entry.path)
+            if entry.is_dir(follow_symlinks=False):
+                _scan_tree(entry.path, scan)
+            elif name.endswith('.py') and entry.is_file(follow_symlinks=False):
+                scan['py_files'].append(entry.path)
+                if name.startswith('test_') or name.endswith('_test.py'):
+                    scan['test_files'].append(entry.path)
+
+class _ProjectScanMixin:
+    """缓存项目目录的遍历结果 (statcache 思路), 多个分析方法共享一次遍历"""
+    
+    _scan_cache: Dict[str, List[str]]
+    _root_str: str
+    
+    def _scan(self) -> Dict[str, List[str]]:
+        if not self._scan_cache:
+            scan = {'py_files': [], 'test_files': [], 'coverage_files': []}
+            _scan_tree(self._root_str, scan)
+            self._scan_cache.update(scan)
+        return self._scan_cache
+    
+    def refresh(self):
+        """目录内容变化后丢弃缓存, 下次访问时重新遍历"""
+        self._scan_cache.clear()
+
+# 在原始字节上按行匹配, 免去逐行 decode/strip 分配
+_COMMENT_LINE_RE = re.compile(rb'^[ \t\f\v]*#', re.MULTILINE)
+_BLANK_LINE_RE = re.compile(rb'^[ \t\f\v\r]*$', re.MULTILINE)
+
+def _count_lines(path: str) -> Tuple[str, Dict[str, Any]]:
+    """统计单个文件的代码/注释/空行 (模块级函数, 可被进程池 pickle)"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        
+        total = data.count(b'\n')
+        blank = len(_BLANK_LINE_RE.findall(data))
+        if data.endswith(b'\n') or not data:
+            # 末尾换行之后的空串也会被 ^$ 匹配, 不算一行
+            blank -= 1
+        else:
+            total += 1
+        comment = len(_COMMENT_LINE_RE.findall(data))
+        
+        return path, {
+            'total_lines': total,
+            'code_lines': total - comment - blank,
+            'comment_lines': comment,
+            'blank_lines': blank
+        }
+    except Exception as e:
+        return path, {'error': str(e)}
+
+def _chunked(items: List[str], size: int) -> List[List[str]]:
+    """按 size 切成连续的若干片, 空列表也返回一片"""
+    it = iter(items)
+    chunks = list(iter(lambda: list(itertools.islice(it, size)), []))
+    return chunks or [[]]
+
+def _merge_json_outputs(outputs: List[str]) -> str:
+    """合并各分片输出的JSON文档: 数组拼接, 对象 (flake8按文件名分组) 合并键"""
+    docs = [json.loads(out) for out in outputs if out.strip()]
+    if not docs:
+        return ''.join(outputs)
+    if all(isinstance(doc, list) for doc in docs):
+        return json.dumps(list(itertools.chain.from_iterable(docs)))
+    if all(isinstance(doc, dict) for doc in docs):
+        merged = {}
+        for doc in docs:
+            merged.update(doc)
+        return json.dumps(merged)
+    raise ValueError('分片输出的JSON结构不一致, 无法合并')
 
 class BuildSystemAnalyzer:
     """构建系统分析器"""
     
     def __init__(self, project_root: str = "."):
         self.project_root = Path(project_root)
+        self._root_str = str(self.project_root)
         self.build_systems = {
             'setup.py': 'setuptools',
             'pyproject.toml': 'poetry/flit',
@@ -33,15 +151,29 @@ class BuildSystemAnalyzer:
             'noxfile.py': 'nox'
         }
     
-    def detect_build_system(self) -> Dict[str, Any]:
-        """检测项目使用的构建系统"""
-        detected = {}
-        
-        for filename, system in self.build_systems.items():
-            file_path = self.project_root / filename
-            if file_path.exists():
-                detected[system] = str(file_path)
-        
+    def detect_build_system(self, primary_only: bool = False) -> Dict[str, Any]:
+        """检测项目使用的构建系统
+        
+        primary_only=True 时按优先级逐个探测, 命中第一个即返回, 不读取整个目录.
+        """
+        if primary_only:
+            detected = {}
+            for filename, system in self.build_systems.items():
+                if os.path.exists(os.path.join(self._root_str, filename)):
+                    detected[system] = str(self.project_root / filename)
+                    break
+        else:
+            # 一次读目录代替逐个文件 stat; 目录不可读或不存在时与 primary_only 一致返回空结果
+            try:
+                with os.scandir(self.project_root) as it:
+                    names = {entry.name for entry in it}
+            except OSError:
+                names = set()
+
+            detected = {system: str(self.project_root / filename)
+                        for filename, system in self.build_systems.items()
+                        if filename in names}
+
         return {
             'project_root': str(self.project_root),
             'build_systems': detected,
@@ -57,15 +189,18 @@ class BuildSystemAnalyzer:
         }
         
         # 分析requirements.txt
-        req_file = self.project_root / "requirements.txt"
-        if req_file.exists():
-            with open(req_file) as f:
-                dependencies['runtime'] = [line.strip() for line in f 
-                                         if line.strip() and not line.startswith('#')]
+        req_file = os.path.join(self._root_str, "requirements.txt")
+        if os.path.isfile(req_file):
+            # 整体按字节读入再切分, 每行只 strip 一次, 仅对保留的行解码
+            with open(req_file, 'rb') as f:
+                data = f.read()
+            dependencies['runtime'] = [stripped.decode()
+                                       for line in data.split(b'\n')
+                                       if (stripped := line.strip())
+                                       and not stripped.startswith(b'#')]
         
         # 分析setup.py
-        setup_py = self.project_root / "setup.py"
-        if setup_py.exists():
+        if os.path.isfile(os.path.join(self._root_str, "setup.py")):
             try:
                 result = subprocess.run([sys.executable, "setup.py", "--requires"], 
                                       capture_output=True, text=True, cwd=self.project_root)
@@ -90,18 +225,16 @@ class PackageManager:
     
     def _check_command(self, cmd: str) -> bool:
         """检查命令是否可用"""
-        return shutil.which(cmd) is not None
+        return _which(cmd) is not None
     
     def get_installed_packages(self) -> Dict[str, str]:
         """获取已安装的包信息"""
         packages = {}
         
         try:
-            result = subprocess.run([sys.executable, '-m', 'pip', 'list', '--format=json'],
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                packages = {pkg['name']: pkg['version'] for pkg in data}
+            # 进程内直接读取元数据, 免去 fork pip 子进程和 JSON 解析
+            packages = {dist.metadata['Name']: dist.version
+                        for dist in distributions()}
         except Exception as e:
             print(f"获取包信息失败: {e}")
         
@@ -114,7 +247,9 @@ class PackageManager:
             if python_version:
                 cmd.extend(['--python', python_version])
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # 只关心返回码, 输出直接丢弃, 不建管道也不解码
+            result = _spawn(cmd, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
             return result.returncode == 0
         except Exception as e:
             print(f"创建虚拟环境失败: {e}")
@@ -128,17 +263,28 @@ class PackageManager:
         cmd.extend(packages)
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # 只关心返回码, 输出直接丢弃, 不建管道也不解码
+            result = _spawn(cmd, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
             return result.returncode == 0
         except Exception as e:
             print(f"安装包失败: {e}")
             return False
 
-class TestFramework:
+class TestFramework(_ProjectScanMixin):
     """测试框架集成"""
     
     def __init__(self, project_root: str = "."):
         self.project_root = Path(project_root)
+        self._root_str = str(self.project_root)
+        self._scan_cache = {}
+        # pyproject.toml 只读一次, 供各检测方法复用
+        pyproject = os.path.join(self._root_str, "pyproject.toml")
+        if os.path.isfile(pyproject):
+            with open(pyproject) as f:
+                self._pyproject_text = f.read()
+        else:
+            self._pyproject_text = ""
         self.test_frameworks = {
             'pytest': self._has_pytest,
             'unittest': self._has_unittest,
@@ -147,20 +293,17 @@ class TestFramework:
         }
     
     def _has_pytest(self) -> bool:
-        return (self.project_root / "pytest.ini").exists() or \
-               (self.project_root / "pyproject.toml").exists() and 
-               "pytest" in (self.project_root / "pyproject.toml").read_text()
+        return os.path.isfile(os.path.join(self._root_str, "pytest.ini")) or \
+               "pytest" in self._pyproject_text
     
     def _has_unittest(self) -> bool:
-        test_files = list(self.project_root.glob("**/test_*.py")) + \
-                    list(self.project_root.glob("**/*_test.py"))
-        return len(test_files) > 0
+        return bool(self._scan()['test_files'])
     
     def _has_nose(self) -> bool:
-        return (self.project_root / "nose.cfg").exists()
+        return os.path.isfile(os.path.join(self._root_str, "nose.cfg"))
     
     def _has_tox(self) -> bool:
-        return (self.project_root / "tox.ini").exists()
+        return os.path.isfile(os.path.join(self._root_str, "tox.ini"))
     
     def detect_test_framework(self) -> Dict[str, Any]:
         """检测测试框架"""
@@ -172,13 +315,18 @@ class TestFramework:
         
         return {
             'available_frameworks': detected,
-            'test_files': list(self.project_root.glob("**/test_*.py")) + 
-                         list(self.project_root.glob("**/*_test.py")),
-            'coverage_files': list(self.project_root.glob("**/.coverage*"))
+            'test_files': [Path(p) for p in self._scan()['test_files']],
+            'coverage_files': [Path(p) for p in self._scan()['coverage_files']]
         }
     
-    def run_tests(self, framework: str = "pytest") -> Dict[str, Any]:
-        """运行测试"""
+    def run_tests(self, framework: str = "pytest",
+                  workers: Optional[int] = None) -> Dict[str, Any]:
+        """运行测试
+        
+        安装了 pytest-xdist 时按文件分发到多个进程并行执行, workers 默认为 auto.
+        会话级 fixture 在每个 worker 中各执行一次, 需要全局只跑一次的准备工作
+        可用 filelock.FileLock 加锁并在共享临时目录缓存结果.
+        """
         result = {
             'framework': framework,
             'success': False,
@@ -190,8 +338,10 @@ class TestFramework:
         try:
             if framework == "pytest":
                 cmd = [sys.executable, '-m', 'pytest', '-v', '--tb=short']
-                if (self.project_root / '.coveragerc').exists():
+                if os.path.isfile(os.path.join(self._root_str, '.coveragerc')):
                     cmd.extend(['--cov', str(self.project_root)])
+                if importlib.util.find_spec("xdist") is not None:
+                    cmd.extend(['-n', str(workers or 'auto'), '--dist', 'loadfile'])
                 
                 proc = subprocess.run(cmd, capture_output=True, text=True, 
                                     cwd=self.project_root)
@@ -204,88 +354,106 @@ class TestFramework:
         
         return result
 
-class CodeQualityAnalyzer:
+class CodeQualityAnalyzer(_ProjectScanMixin):
     """代码质量分析器"""
     
+    PARALLEL_MIN_FILES = 64
+    # 单次检查器调用的最大文件数, 防止命令行超出 ARG_MAX
+    ARGV_CHUNK_SIZE = 500
+    # 跨文件分析 (pylint duplicate-code, mypy 模块间类型推断) 需要一次看到全部文件, 不分片
+    UNSHARDED_LINTERS = frozenset({'pylint', 'mypy'})
+    # 输出为单个JSON文档的检查器, 分片结果需解析后合并, 不能直接拼接文本
+    JSON_DOCUMENT_LINTERS = frozenset({'pylint', 'flake8', 'ruff'})
+    
     def __init__(self, project_root: str = "."):
         self.project_root = Path(project_root)
-    
-    def run_linter(self, linter: str = "pylint") -> Dict[str, Any]:
-        """运行代码检查工具"""
+        self._root_str = str(self.project_root)
+        self._scan_cache = {}
+    
+    @property
+    def python_files(self) -> List[str]:
+        """项目内全部 .py 文件 (首次访问时遍历一次, 之后复用缓存)"""
+        return self._scan()['py_files']
+    
+    def run_linter(self, linter: str = "pylint", use_daemon: bool = False,
+                   max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """运行代码检查工具
+        
+        use_daemon=True 时对支持的检查器改用常驻守护进程 (mypy -> dmypy),
+        重复运行时免去每次重新导入检查器的启动开销.
+        max_workers 限制本次调用同时运行的检查器子进程数 (默认CPU核数);
+        多个检查器并发运行时应按总预算分摊, 避免子进程数超额.
+        ruff 单个二进制即可覆盖 flake8/isort/pyupgrade 等规则, 推荐优先使用.
+        """
         linters = {
             'pylint': ['pylint', '--output-format=json'],
             'flake8': ['flake8', '--format=json'],
             'black': ['black', '--check', '--diff'],
             'isort': ['isort', '--check-only', '--diff'],
-            'mypy': ['mypy', '--json']
+            'mypy': ['mypy', '--json'],
+            'ruff': ['ruff', 'check', '--output-format=json']
+        }
+        daemon_linters = {
+            'mypy': ['dmypy', 'run', '--']
         }
         
         if linter not in linters:
             return {'error': f'不支持的检查器: {linter}'}
         
-        if not shutil.which(linter):
-            return {'error': f'{linter} 未安装'}
+        daemon = use_daemon and linter in daemon_linters
+        cmd = daemon_linters[linter] if daemon else linters[linter]
+        
+        if not _which(cmd[0]):
+            return {'error': f'{cmd[0]} 未安装'}
         
         try:
-            cmd = linters[linter]
-            python_files = list(self.project_root.rglob("*.py"))
-            cmd.extend([str(f) for f in python_files])
+            def run_shard(files: List[str]) -> subprocess.CompletedProcess:
+                return subprocess.run(cmd + files, capture_output=True, text=True,
+                                      cwd=self.project_root)
             
-            result = subprocess.run(cmd, capture_output=True, text=True, 
-                                  cwd=self.project_root)
+            workers = max_workers or os.cpu_count() or 1
+            if daemon:
+                # 守护进程按整个目录增量检查, 不分片以免并发请求互相打断
+                shards = [['.']]
+            elif linter in self.UNSHARDED_LINTERS:
+                shards = [self.python_files]
+            else:
+                # 按CPU核数分片且每片不超过 ARGV_CHUNK_SIZE, 每片一个检查器子进程并行运行
+                size = min(self.ARGV_CHUNK_SIZE,
+                           max(1, -(-len(self.python_files) // workers)))
+                shards = _chunked(self.python_files, size)
+            with ThreadPoolExecutor(max_workers=min(workers, len(shards))) as ex:
+                results = list(ex.map(run_shard, shards))
             
+            returncode = next((r.returncode for r in results if r.returncode), 0)
+            outputs = [r.stdout for r in results]
+            if len(outputs) > 1 and linter in self.JSON_DOCUMENT_LINTERS:
+                output = _merge_json_outputs(outputs)
+            else:
+                output = ''.join(outputs)
             return {
                 'linter': linter,
-                'success': result.returncode == 0,
-                'output': result.stdout,
-                'error': result.stderr,
-                'returncode': result.returncode
+                'success': returncode == 0,
+                'output': output,
+                'error': ''.join(r.stderr for r in results),
+                'returncode': returncode
             }
         except Exception as e:
             return {'error': str(e)}
     
     def analyze_code_complexity(self) -> Dict[str, Any]:
         """分析代码复杂度"""
-        complexity_report = {}
+        python_files = self.python_files
         
-        for py_file in self.project_root.rglob("*.py"):
-            try:
-                with open(py_file) as f:
-                    lines = f.readlines()
-                
-                complexity_report[str(py_file)] = {
-                    'total_lines': len(lines),
-                    'code_lines': len([l for l in lines if l.strip() and not l.strip().startswith('#')]),
-                    'comment_lines': len([l for l in lines if l.strip().startswith('#')]),
-                    'blank_lines': len([l for l in lines if not l.strip()])
-                }
-            except Exception as e:
-                complexity_report[str(py_file)] = {'error': str(e)}
+        # 文件少时进程启动开销大于收益, 直接串行
+        if len(python_files) < self.PARALLEL_MIN_FILES:
+            return dict(map(_count_lines, python_files))
         
-        return complexity_report
+        with ProcessPoolExecutor() as ex:
+            return dict(ex.map(_count_lines, python_files, chunksize=32))
 
-class DevelopmentWorkflow:
-    """开发工作流管理"""
-    
-    def __init__(self, project_root: str = "."):
-        self.project_root = Path(project_root)
-        self.logger = self._setup_logging()
-    
-    def _setup_logging(self) -> logging.Logger:
-        """设置日志"""
-        logger = logging.getLogger('dev_tools')
-        logger.setLevel(logging.INFO)
-        
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
-    
-    def setup_pre_commit_hooks(self) -> bool:
-        """设置pre-commit钩子"""
-        pre_commit_config = """
+# 项目模板在模块加载时一次编码为 bytes, 生成时仅做 $project_name 字节替换后 write_bytes
+_PRE_COMMIT_CONFIG = """
 repos:
   - repo: https://github.com/psf/black
     rev: 22.3.0
@@ -307,63 +475,18 @@ repos:
     rev: v0.950
     hooks:
       - id: mypy
-"""
-        
-        try:
-            config_path = self.project_root / ".pre-commit-config.yaml"
-            with open(config_path, 'w') as f:
-                f.write(pre_commit_config)
-            
-            # 安装pre-commit
-            subprocess.run([sys.executable, '-m', 'pip', 'install', 'pre-commit'], 
-                         check=True)
-            subprocess.run(['pre-commit', 'install'], check=True)
-            
-            self.logger.info("Pre-commit钩子设置完成")
-            return True
-        except Exception as e:
-            self.logger.error(f"设置pre-commit钩子失败: {e}")
-            return False
-    
-    def create_project_structure(self, project_name: str) -> bool:
-        """创建项目结构"""
-        try:
-            project_dir = self.project_root / project_name
-            project_dir.mkdir(exist_ok=True)
-            
-            # 创建目录结构
-            directories = [
-                'src', 'tests', 'docs', 'scripts', '.github/workflows'
-            ]
-            
-            for dir_name in directories:
-                (project_dir / dir_name).mkdir(parents=True, exist_ok=True)
-            
-            # 创建基本文件
-            self._create_setup_files(project_dir, project_name)
-            self._create_test_files(project_dir, project_name)
-            self._create_documentation(project_dir, project_name)
-            
-            self.logger.info(f"项目结构创建完成: {project_dir}")
-            return True
-        except Exception as e:
-            self.logger.error(f"创建项目结构失败: {e}")
-            return False
-    
-    def _create_setup_files(self, project_dir: Path, project_name: str):
-        """创建配置文件"""
-        
-        # pyproject.toml
-        pyproject_content = f"""[build-system]
+""".encode()
+
+_PYPROJECT_TMPL = """[build-system]
 requires = ["setuptools>=45", "wheel"]
 build-backend = "setuptools.build_meta"
 
 [project]
-name = "{project_name}"
+name = "$project_name"
 version = "0.1.0"
 description = "A Python project"
-authors = [{{name = "Developer", email = "dev@example.com"}}]
-license = {{text = "MIT"}}
+authors = [{name = "Developer", email = "dev@example.com"}]
+license = {text = "MIT"}
 readme = "README.md"
 requires-python = ">=3.8"
 classifiers = [
@@ -389,7 +512,7 @@ dev = [
 ]
 
 [project.scripts]
-{project_name} = "{project_name}.__main__:main"
+$project_name = "$project_name.__main__:main"
 
 [tool.setuptools.packages.find]
 where = ["src"]
@@ -414,13 +537,9 @@ python_files = ["test_*.py"]
 python_classes = ["Test*"]
 python_functions = ["test_*"]
 addopts = "--cov=src --cov-report=html --cov-report=term-missing"
-"""
-        
-        with open(project_dir / "pyproject.toml", 'w') as f:
-            f.write(pyproject_content)
-        
-        # README.md
-        readme_content = f"""# {project_name}
+""".encode()
+
+_README_TMPL = """# $project_name
 
 A Python project with modern development tools.
 
@@ -444,43 +563,30 @@ pytest
 
 ## 项目结构
 ```
-{project_name}/
-├── src/{project_name}/     # 源代码
+$project_name/
+├── src/$project_name/     # 源代码
 ├── tests/                # 测试文件
 ├── docs/                 # 文档
 ├── scripts/              # 脚本文件
 └── .github/workflows/    # CI/CD配置
 ```
-"""
-        
-        with open(project_dir / "README.md", 'w') as f:
-            f.write(readme_content)
-    
-    def _create_test_files(self, project_dir: Path, project_name: str):
-        """创建测试文件"""
-        
-        # __init__.py
-        init_content = f'"""{project_name} package."""\n'
-        with open(project_dir / "src" / project_name / "__init__.py", 'w') as f:
-            f.write(init_content)
-        
-        # __main__.py
-        main_content = f'''"""Main module for {project_name}."""
+""".encode()
+
+_INIT_TMPL = '"""$project_name package."""\n'.encode()
+
+_MAIN_TMPL = '''"""Main module for $project_name."""
 
 def main():
     """Main function."""
-    print("Hello from {project_name}!")
+    print("Hello from $project_name!")
 
 if __name__ == "__main__":
     main()
-'''
-        with open(project_dir / "src" / project_name / "__main__.py", 'w') as f:
-            f.write(main_content)
-        
-        # 测试文件
-        test_content = f'''"""Tests for {project_name}."""
+'''.encode()
+
+_TEST_TMPL = '''"""Tests for $project_name."""
 import pytest
-from {project_name} import __version__
+from $project_name import __version__
 
 def test_version():
     """Test version is defined."""
@@ -488,17 +594,11 @@ def test_version():
 
 def test_import():
     """Test package can be imported."""
-    import {project_name}
-    assert {project_name} is not None
-'''
-        with open(project_dir / "tests" / "test_basic.py", 'w') as f:
-            f.write(test_content)
-    
-    def _create_documentation(self, project_dir: Path, project_name: str):
-        """创建文档"""
-        
-        # GitHub Actions workflow
-        workflow_content = f'''name: CI
+    import $project_name
+    assert $project_name is not None
+'''.encode()
+
+_CI_WORKFLOW_TMPL = '''name: CI
 
 on:
   push:
@@ -533,18 +633,103 @@ jobs:
     - name: Test with pytest
       run: |
         pytest
-'''
+'''.encode()
+
+class DevelopmentWorkflow:
+    """开发工作流管理"""
+    
+    def __init__(self, project_root: str = "."):
+        self.project_root = Path(project_root)
+        self.logger = self._setup_logging()
+    
+    def _setup_logging(self) -> logging.Logger:
+        """设置日志"""
+        logger = logging.getLogger('dev_tools')
+        logger.setLevel(logging.INFO)
+        
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s',
+                                      datefmt='%H:%M:%S')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+        
+        return logger
+    
+    def setup_pre_commit_hooks(self) -> bool:
+        """设置pre-commit钩子"""
+        try:
+            (self.project_root / ".pre-commit-config.yaml").write_bytes(_PRE_COMMIT_CONFIG)
+            
+            # 安装pre-commit; 不捕获输出, 失败时pip/pre-commit的错误信息直接显示在终端
+            _spawn([sys.executable, '-m', 'pip', 'install', 'pre-commit'], check=True)
+            _spawn(['pre-commit', 'install'], check=True)
+            
+            self.logger.info("Pre-commit钩子设置完成")
+            return True
+        except Exception as e:
+            self.logger.error(f"设置pre-commit钩子失败: {e}")
+            return False
+    
+    def create_project_structure(self, project_name: str) -> bool:
+        """创建项目结构"""
+        try:
+            project_dir = self.project_root / project_name
+            project_dir.mkdir(exist_ok=True)
+            
+            # 创建目录结构
+            directories = [
+                'src', 'tests', 'docs', 'scripts', '.github/workflows'
+            ]
+            
+            for dir_name in directories:
+                (project_dir / dir_name).mkdir(parents=True, exist_ok=True)
+            
+            # 创建基本文件
+            self._create_setup_files(project_dir, project_name)
+            self._create_test_files(project_dir, project_name)
+            self._create_documentation(project_dir, project_name)
+            
+            self.logger.info(f"项目结构创建完成: {project_dir}")
+            return True
+        except Exception as e:
+            self.logger.error(f"创建项目结构失败: {e}")
+            return False
+    
+    def _create_setup_files(self, project_dir: Path, project_name: str):
+        """创建配置文件"""
         
+        name = project_name.encode()
+        (project_dir / "pyproject.toml").write_bytes(_PYPROJECT_TMPL.replace(b'$project_name', name))
+        (project_dir / "README.md").write_bytes(_README_TMPL.replace(b'$project_name', name))
+    
+    def _create_test_files(self, project_dir: Path, project_name: str):
+        """创建测试文件"""
+        
+        name = project_name.encode()
+        package_dir = project_dir / "src" / project_name
+        package_dir.mkdir(parents=True, exist_ok=True)
+        
+        (package_dir / "__init__.py").write_bytes(_INIT_TMPL.replace(b'$project_name', name))
+        (package_dir / "__main__.py").write_bytes(_MAIN_TMPL.replace(b'$project_name', name))
+        (project_dir / "tests" / "test_basic.py").write_bytes(_TEST_TMPL.replace(b'$project_name', name))
+    
+    def _create_documentation(self, project_dir: Path, project_name: str):
+        """创建文档"""
+        
+        # GitHub Actions workflow
         workflow_dir = project_dir / ".github" / "workflows"
         workflow_dir.mkdir(parents=True, exist_ok=True)
         
-        with open(workflow_dir / "ci.yml", 'w') as f:
-            f.write(workflow_content)
+        (workflow_dir / "ci.yml").write_bytes(_CI_WORKFLOW_TMPL)
 
 class PerformanceProfiler:
     """性能分析工具"""
     
-    def __init__(self):
+    def __init__(self, accumulate: bool = False):
+        # accumulate=True 时同一函数多次 profile_function 的数据累积到缓存的
+        # pstats.Stats 中, 输出覆盖全部运行, 单次运行的抖动被平均掉
+        self.accumulate = accumulate
+        self._stats_cache: Dict[Any, Any] = {}
         self.profilers = {
             'cprofile': self._run_cprofile,
             'line_profiler': self._run_line_profiler,
@@ -556,7 +741,7 @@ class PerformanceProfiler:
         """运行cProfile"""
         try:
             cmd = [sys.executable, '-m', 'cProfile', '-s', 'cumulative', script]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = _spawn(cmd, capture_output=True, text=True)
             
             return {
                 'profiler': 'cProfile',
@@ -571,11 +756,11 @@ class PerformanceProfiler:
         """运行line_profiler"""
         try:
             # 需要安装line_profiler
-            if not shutil.which('kernprof'):
+            if not _which('kernprof'):
                 return {'error': 'line_profiler未安装'}
             
             cmd = ['kernprof', '-l', '-v', script]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = _spawn(cmd, capture_output=True, text=True)
             
             return {
                 'profiler': 'line_profiler',
@@ -592,7 +777,8 @@ class PerformanceProfiler:
         import pstats
         import io
         
-        pr = cProfile.Profile()
+        # 只记录用户函数, 不跟踪内置函数调用和调用者明细, 降低分析开销与失真
+        pr = cProfile.Profile(subcalls=False, builtins=False)
         pr.enable()
         
         result = func(*args, **kwargs)
@@ -600,7 +786,16 @@ class PerformanceProfiler:
         pr.disable()
         
         s = io.StringIO()
-        ps = pstats.Stats(pr, stream=s).sort_stats('cumulative')
+        ps = self._stats_cache.get(func) if self.accumulate else None
+        if ps is None:
+            ps = pstats.Stats(pr, stream=s)
+            if self.accumulate:
+                self._stats_cache[func] = ps
+        else:
+            ps.add(pr)
+            ps.stream = s
+        # add() 会清除排序结果, 每次打印前重新排序
+        ps.sort_stats('cumulative')
         ps.print_stats(10)
         
         return {
@@ -639,8 +834,16 @@ def main():
     
     # 检查linters
     linters = ['flake8', 'black', 'isort', 'mypy']
-    for linter in linters:
-        result = quality_analyzer.run_linter(linter)
+    # 各检查器是独立子进程, 用线程池并发等待即可; map 保持原有输出顺序.
+    # 先在主线程完成目录遍历并缓存, 避免各线程同时扫描
+    python_files = quality_analyzer.python_files
+    print(f"Python文件: {len(python_files)}")
+    # 各检查器内部还会分片并行, 按CPU核数在检查器之间分摊, 总子进程数不超过核数
+    per_linter = max(1, (os.cpu_count() or 1) // len(linters))
+    with ThreadPoolExecutor(max_workers=len(linters)) as ex:
+        results = list(ex.map(lambda name: quality_analyzer.run_linter(name, max_workers=per_linter),
+                              linters))
+    for linter, result in zip(linters, results):
         status = '✓' if result.get('success', False) else '✗'
         print(f"{linter}: {status}")
     
@@ -675,4 +878,7 @@ def main():
     print("8. 维护良好的项目文档")
 
 if __name__ == "__main__":
+    # 作为脚本运行时不收集线程/进程信息, 减少每条日志记录的开销;
+    # 这些是logging的全局开关, 被导入时不修改
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
     main()
\ No newline at end of file
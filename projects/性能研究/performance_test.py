@@ -5,6 +5,7 @@ Python性能测试深度研究
 """
 
 import time
+import asyncio
 import random
 import string
 import json
@@ -14,12 +15,240 @@ import sys
 import threading
 import multiprocessing
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
-from typing import List, Dict, Any, Callable
+from typing import List, Dict, Any, Callable, Tuple
 import timeit
 import tracemalloc
 import gc
 import statistics
 import math
+import atexit
+import functools
+import importlib.util
+import textwrap
+from collections import deque
+from dataclasses import dataclass
+
+# numba以LLVM把数值循环编译为机器码; 未安装时算术测试回退到解释器循环
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# orjson(Rust)/ujson(C) 直接写入字节缓冲区, 作为标准库json的对照组; 都未安装时只测标准库
+try:
+    import orjson as fast_json
+except ImportError:
+    try:
+        import ujson as fast_json
+    except ImportError:
+        fast_json = None
+
+# NumPy以C层SIMD归约替代逐元素的Python加法; 未安装时不提供向量化版本
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def _integer_addition(n):
+    total = 0
+    for i in range(n):
+        total += i
+    return total
+
+def _float_addition(n):
+    total = 0.0
+    for i in range(n):
+        total += float(i)
+    return total
+
+def _multiplication(n):
+    total = 1.0
+    for i in range(1, n):
+        total *= 1.000001
+    return total
+
+def _division(n):
+    total = 1.0
+    for i in range(1, n):
+        total /= 1.000001
+    return total
+
+_ARITHMETIC_KERNELS = {
+    'integer_addition': _integer_addition,
+    'float_addition': _float_addition,
+    'multiplication': _multiplication,
+    'division': _division
+}
+
+# 解释器版本的循环体模板; 运行时把迭代次数作为常量写入源码再编译(部分求值)
+_ARITHMETIC_LOOP_BODIES = {
+    'integer_addition': "total = 0\nfor i in range({n}):\n    total += i",
+    'float_addition': "total = 0.0\nfor i in range({n}):\n    total += float(i)",
+    'multiplication': "total = 1.0\nfor i in range(1, {n}):\n    total *= 1.000001",
+    'division': "total = 1.0\nfor i in range(1, {n}):\n    total /= 1.000001"
+}
+
+@functools.lru_cache(maxsize=None)
+def _codegen_loop(name: str, body: str, n: int) -> Callable[[], Any]:
+    """生成以 n 为字面常量的无参函数, 按 (name, body, n) 缓存, 重复运行不再编译"""
+    source = f"def {name}():\n{textwrap.indent(body.format(n=n), '    ')}\n    return total\n"
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<codegen:{name}>", "exec"), namespace)
+    return namespace[name]
+
+def _integer_addition_np(n):
+    return int(np.arange(n, dtype=np.int64).sum())
+
+def _float_addition_np(n):
+    return float(np.arange(n, dtype=np.float64).sum())
+
+def _multiplication_closed(n):
+    # 连乘 n-1 次常数的闭式解, O(N) 降为 O(1)
+    return math.pow(1.000001, max(n - 1, 0))
+
+def _division_closed(n):
+    return math.pow(1.000001, -max(n - 1, 0))
+
+if np is not None:
+    _ARITHMETIC_KERNELS_VECTORIZED = {
+        'integer_addition': _integer_addition_np,
+        'float_addition': _float_addition_np,
+        'multiplication': _multiplication_closed,
+        'division': _division_closed
+    }
+else:
+    _ARITHMETIC_KERNELS_VECTORIZED = {}
+
+if njit is not None:
+    # cache=True 把编译结果写入 __pycache__, 后续进程免去数秒的首次编译
+    _ARITHMETIC_KERNELS_JIT = {
+        name: njit(cache=True, fastmath=True)(kernel)
+        for name, kernel in _ARITHMETIC_KERNELS.items()
+    }
+else:
+    _ARITHMETIC_KERNELS_JIT = {}
+
+def _sum_array(arr):
+    total = 0
+    for i in range(arr.shape[0]):
+        total += arr[i]
+    return total
+
+def _bubblesort_inplace(a):
+    n = a.shape[0]
+    for i in range(n):
+        for j in range(n - i - 1):
+            if a[j] > a[j + 1]:
+                a[j], a[j + 1] = a[j + 1], a[j]
+
+def _quicksort_inplace(a):
+    # Hoare划分 + 显式栈; 较大分段入栈, 较小分段就地继续, 栈深 O(log n)
+    n = a.shape[0]
+    if n < 2:
+        return
+    stack = [(0, n - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        while lo < hi:
+            pivot = a[(lo + hi) // 2]
+            i, j = lo, hi
+            while i <= j:
+                while a[i] < pivot:
+                    i += 1
+                while a[j] > pivot:
+                    j -= 1
+                if i <= j:
+                    a[i], a[j] = a[j], a[i]
+                    i += 1
+                    j -= 1
+            if j - lo < hi - i:
+                if i < hi:
+                    stack.append((i, hi))
+                hi = j
+            else:
+                if lo < j:
+                    stack.append((lo, j))
+                lo = i
+
+# 数组内核需要 numba 与 numpy 同时可用; 显式签名使排序内核在导入时即完成编译
+if njit is not None and np is not None:
+    _sum_array_jit = njit(cache=True)(_sum_array)
+    _bubblesort_jit = njit('void(int64[:])', cache=True)(_bubblesort_inplace)
+    _quicksort_jit = njit('void(int64[:])', cache=True)(_quicksort_inplace)
+else:
+    _sum_array_jit = _bubblesort_jit = _quicksort_jit = None
+
+_perf_counter = time.perf_counter
+
+class _NoGC:
+    """计时区间内关闭分代GC: 进入前先完整回收一次, 避免GC停顿落入测量; 退出时恢复原状态"""
+    
+    def __enter__(self):
+        self._was_enabled = gc.isenabled()
+        gc.collect()
+        gc.disable()
+        return self
+    
+    def __exit__(self, *exc_info):
+        if self._was_enabled:
+            gc.enable()
+        return False
+
+class _MemoryTracing:
+    """tracemalloc作用域: 未在追踪时才启动, 退出时只停止自己启动的追踪.
+    嵌套使用时外层保持钩子常驻, 内层测量不再反复安装/卸载"""
+    
+    def __enter__(self):
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(1)
+        return self
+    
+    def __exit__(self, *exc_info):
+        if self._started:
+            tracemalloc.stop()
+        return False
+
+# 固定种子的生成器, 测试数据可复现
+_rng = np.random.default_rng(0) if np is not None else None
+
+def _random_ints(low: int, high: int, size: int) -> List[int]:
+    """批量生成 [low, high] 内的随机整数; 有numpy时由一次C层调用填充整块缓冲"""
+    if _rng is not None:
+        return _rng.integers(low, high + 1, size=size).tolist()
+    return random.choices(range(low, high + 1), k=size)
+
+def _sqrt_sum_slice(data, start, end):
+    # 对真实数组做浮点归约: 未开fastmath时浮点加法不可重排, LLVM无法把循环化为闭式解
+    total = 0.0
+    for i in range(start, end):
+        total += math.sqrt(data[i])
+    return total
+
+# nogil=True 让编译后的内核执行期间释放GIL, 多线程可真正并行
+if njit is not None and np is not None:
+    _sqrt_sum_nogil = njit(nogil=True, cache=True)(_sqrt_sum_slice)
+else:
+    _sqrt_sum_nogil = None
+
+def _sum_range(bounds: Tuple[int, int]) -> int:
+    """多进程测试的工作函数; 只传 (start, end), 进程间不再序列化整段数据"""
+    start, end = bounds
+    return sum(range(start, end))
+
+_PROCESS_POOLS: Dict[int, ProcessPoolExecutor] = {}
+
+def _get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """按进程数复用进程池, 多次运行基准测试只付一次进程启动开销"""
+    pool = _PROCESS_POOLS.get(max_workers)
+    if pool is None:
+        pool = _PROCESS_POOLS[max_workers] = ProcessPoolExecutor(max_workers=max_workers)
+    return pool
+
+@atexit.register
+def _shutdown_process_pools():
+    for pool in _PROCESS_POOLS.values():
+        pool.shutdown()
 
 class PerformanceTester:
     """性能测试基类"""
@@ -29,9 +258,10 @@ class PerformanceTester:
     
     def measure_time(self, func: Callable, *args, **kwargs) -> Dict[str, Any]:
         """测量函数执行时间"""
-        start_time = time.perf_counter()
-        result = func(*args, **kwargs)
-        end_time = time.perf_counter()
+        with _NoGC():
+            start_time = _perf_counter()
+            result = func(*args, **kwargs)
+            end_time = _perf_counter()
         
         return {
             'function': func.__name__,
@@ -39,15 +269,36 @@ class PerformanceTester:
             'result': result
         }
     
-    def measure_memory(self, func: Callable, *args, **kwargs) -> Dict[str, Any]:
-        """测量内存使用"""
-        tracemalloc.start()
-        start_memory = tracemalloc.get_traced_memory()[0]
-        
-        result = func(*args, **kwargs)
+    def measure_time_repeated(self, func: Callable, *args, repeat: int = 5,
+                              **kwargs) -> Dict[str, Any]:
+        """测量亚毫秒级函数: autorange 自动确定循环次数 (总时长≥0.2s),
+        重复 repeat 轮取最快一轮的单次平均耗时, 比单次计时稳定得多"""
+        call = functools.partial(func, *args, **kwargs)
+        timer = timeit.Timer(call)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
         
-        current, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
+        return {
+            'function': func.__name__,
+            'execution_time': best,
+            'loops': number,
+            'result': call()
+        }
+    
+    def measure_memory(self, func: Callable, *args, **kwargs) -> Dict[str, Any]:
+        """测量内存使用
+        
+        每次测量只重置峰值. 单独调用时在返回前停止追踪; 连续多次测量时可在外层
+        包一层 _MemoryTracing, 追踪钩子只安装一次, 离开该作用域即停止, 不会拖慢
+        之后其他测试的分配.
+        """
+        with _MemoryTracing(), _NoGC():
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+            
+            result = func(*args, **kwargs)
+            
+            current, peak = tracemalloc.get_traced_memory()
         
         return {
             'function': func.__name__,
@@ -59,38 +310,31 @@ class PerformanceTester:
 class CPUBenchmark(PerformanceTester):
     """CPU性能基准测试"""
     
-    def test_arithmetic_operations(self, iterations: int = 1000000) -> Dict[str, Any]:
-        """测试算术运算性能"""
-        def integer_addition():
-            total = 0
-            for i in range(iterations):
-                total += i
-            return total
-        
-        def float_addition():
-            total = 0.0
-            for i in range(iterations):
-                total += float(i)
-            return total
-        
-        def multiplication():
-            total = 1.0
-            for i in range(1, iterations):
-                total *= 1.000001
-            return total
-        
-        def division():
-            total = 1.0
-            for i in range(1, iterations):
-                total /= 1.000001
-            return total
-        
-        results = {
-            'integer_addition': self.measure_time(integer_addition),
-            'float_addition': self.measure_time(float_addition),
-            'multiplication': self.measure_time(multiplication),
-            'division': self.measure_time(division)
-        }
+    def test_arithmetic_operations(self, iterations: int = 1000000,
+                                   use_jit: bool = True,
+                                   vectorized: bool = True) -> Dict[str, Any]:
+        """测试算术运算性能
+        
+        优先级: vectorized 且安装了 numpy 时用数组归约/闭式解; 其次 use_jit 且
+        安装了 numba 时用编译内核; 两者都关闭时测量解释器循环本身的速度,
+        循环由 _codegen_loop 按 iterations 特化生成.
+        """
+        if vectorized and _ARITHMETIC_KERNELS_VECTORIZED:
+            kernels = _ARITHMETIC_KERNELS_VECTORIZED
+        elif use_jit and _ARITHMETIC_KERNELS_JIT:
+            kernels = _ARITHMETIC_KERNELS_JIT
+            # 实际选用时才预热(首次调用触发编译), 使计时不包含编译时间
+            for kernel in kernels.values():
+                kernel(2)
+        else:
+            kernels = None
+        
+        if kernels is not None:
+            results = {name: self.measure_time(kernel, iterations)
+                       for name, kernel in kernels.items()}
+        else:
+            results = {name: self.measure_time(_codegen_loop(name, body, iterations))
+                       for name, body in _ARITHMETIC_LOOP_BODIES.items()}
         
         # 计算吞吐量
         for test_name, result in results.items():
@@ -105,10 +349,13 @@ class CPUBenchmark(PerformanceTester):
         test_string = "Hello, World! " * 100
         
         def string_concatenation():
-            result = ""
-            for i in range(iterations):
-                result += test_string[:10]
-            return len(result)
+            # 列表累积后一次 join, 线性时间; 不依赖 CPython 的 += 原地优化
+            chunk = test_string[:10]
+            parts = []
+            append = parts.append
+            for _ in range(iterations):
+                append(chunk)
+            return len("".join(parts))
         
         def string_formatting():
             result = []
@@ -131,40 +378,81 @@ class CPUBenchmark(PerformanceTester):
             'string_splitting': self.measure_time(string_splitting)
         }
 
+# 小对象分配测试用的行记录; 手写__slots__而非dataclass(slots=True), 兼容3.10以前的解释器
+@dataclass
+class Row:
+    __slots__ = ('id', 'data')
+    id: int
+    data: str
+
+_BLOB = "x" * 100
+
 class MemoryBenchmark(PerformanceTester):
     """内存性能基准测试"""
     
-    def test_list_operations(self, size: int = 100000) -> Dict[str, Any]:
-        """测试列表操作性能"""
+    def __init__(self):
+        super().__init__()
+        if _sum_array_jit is not None:
+            _sum_array_jit(np.zeros(1, dtype=np.int64))
+    
+    def test_list_operations(self, size: int = 100000,
+                             insert_size: int = 10000) -> Dict[str, Any]:
+        """测试列表操作性能
+        
+        list_insert 每次头插都要 memmove 整个列表, 为 O(n^2) 参考实现,
+        单独使用较小的 insert_size, 避免拖慢整个测试套件.
+        """
         
         def list_creation():
             return [i for i in range(size)]
         
         def list_append():
+            # extend 按 range 的长度提示一次预分配, 无逐元素方法调用
             lst = []
+            lst.extend(range(size))
+            return len(lst)
+        
+        def list_append_method():
+            # 逐个 append 的对照组, 预先绑定方法省去每次属性查找
+            lst = []
+            append = lst.append
             for i in range(size):
-                lst.append(i)
+                append(i)
             return len(lst)
         
         def list_insert():
             lst = []
-            for i in range(size):
+            for i in range(insert_size):
                 lst.insert(0, i)
             return len(lst)
         
+        def list_insert_front_deque():
+            # deque 由定长块组成的双向链表实现, 头插 O(1) 无需搬移元素
+            dq = deque()
+            appendleft = dq.appendleft
+            for i in range(size):
+                appendleft(i)
+            return len(dq)
+        
         def list_lookup():
+            # sum 在C层遍历, 免去逐元素的下标取值与加法字节码
             lst = list(range(size))
-            total = 0
-            for i in range(size):
-                total += lst[i]
-            return total
+            return sum(lst)
         
-        return {
+        results = {
             'list_creation': self.measure_time(list_creation),
             'list_append': self.measure_time(list_append),
+            'list_append_method': self.measure_time(list_append_method),
             'list_insert': self.measure_time(list_insert),
+            'list_insert_front_deque': self.measure_time(list_insert_front_deque),
             'list_lookup': self.measure_time(list_lookup)
         }
+        
+        if _sum_array_jit is not None:
+            arr = np.arange(size, dtype=np.int64)
+            results['list_lookup_jit'] = self.measure_time(_sum_array_jit, arr)
+        
+        return results
     
     def test_dict_operations(self, size: int = 100000) -> Dict[str, Any]:
         """测试字典操作性能"""
@@ -204,7 +492,14 @@ class MemoryBenchmark(PerformanceTester):
         def small_object_allocation():
             objects = []
             for i in range(iterations):
-                objects.append({"id": i, "data": "x" * 100})
+                objects.append({"id": i, "data": _BLOB})
+            return len(objects)
+        
+        def small_object_allocation_slots():
+            # 无__dict__的实例, 与上面的dict版本对照
+            objects = []
+            for i in range(iterations):
+                objects.append(Row(i, _BLOB))
             return len(objects)
         
         def large_object_allocation():
@@ -214,45 +509,72 @@ class MemoryBenchmark(PerformanceTester):
             return len(objects)
         
         def memory_intensive_operation():
+            if np is not None:
+                # 一块连续的二维缓冲区, 替代上万个独立的小列表
+                data = np.tile(np.arange(100), (iterations, 1))
+                return data.size
             data = []
             for i in range(iterations):
                 data.append([j for j in range(100)])
             return sum(len(x) for x in data)
         
-        return {
-            'small_object_allocation': self.measure_memory(small_object_allocation),
-            'large_object_allocation': self.measure_memory(large_object_allocation),
-            'memory_intensive_operation': self.measure_memory(memory_intensive_operation)
-        }
+        # 各项测量共用一次追踪, 离开作用域即停止
+        with _MemoryTracing():
+            return {
+                'small_object_allocation': self.measure_memory(small_object_allocation),
+                'small_object_allocation_slots': self.measure_memory(small_object_allocation_slots),
+                'large_object_allocation': self.measure_memory(large_object_allocation),
+                'memory_intensive_operation': self.measure_memory(memory_intensive_operation)
+            }
 
 class IOTBenchmark(PerformanceTester):
     """IO性能基准测试"""
     
+    WRITE_BUFFER_SIZE = 1 << 20
+    READ_CHUNK_SIZE = 1 << 18
+    
+    def __init__(self):
+        super().__init__()
+        # JSON测试数据及其编码结果只构造一次, 不计入各次测量
+        self.json_payload = {
+            "users": [
+                {"id": i, "name": f"User{i}", "email": f"user{i}@example.com"}
+                for i in range(100)
+            ]
+        }
+        self.json_payload_bytes = json.dumps(self.json_payload).encode()
+    
     def test_file_io(self, file_size_mb: int = 10) -> Dict[str, Any]:
         """测试文件IO性能"""
         filename = f'/tmp/test_{file_size_mb}mb.txt'
-        test_data = "x" * 1024 * 1024  # 1MB data
+        test_data = b"x" * 1024 * 1024  # 1MB data
         
         def write_file():
-            with open(filename, 'w') as f:
+            # 二进制模式免去编码与换行转换, 1MB 缓冲减少 write 系统调用
+            with open(filename, 'wb', buffering=self.WRITE_BUFFER_SIZE) as f:
                 for _ in range(file_size_mb):
                     f.write(test_data)
             return os.path.getsize(filename)
         
         def read_file():
-            with open(filename, 'r') as f:
+            with open(filename, 'rb') as f:
                 data = f.read()
             return len(data)
         
-        def read_line_by_line():
-            with open(filename, 'r') as f:
-                lines = f.readlines()
-            return len(lines)
+        def read_chunked():
+            # 数据中没有换行, 按固定大块流式读取才能测出真实吞吐;
+            # 块已足够大, 关闭缓冲层避免多一次拷贝
+            total = 0
+            chunk_size = self.READ_CHUNK_SIZE
+            with open(filename, 'rb', buffering=0) as f:
+                for chunk in iter(lambda: f.read(chunk_size), b''):
+                    total += len(chunk)
+            return total
         
         results = {
             'write_file': self.measure_time(write_file),
             'read_file': self.measure_time(read_file),
-            'read_line_by_line': self.measure_time(read_line_by_line)
+            'read_chunked': self.measure_time(read_chunked)
         }
         
         # 计算吞吐量
@@ -272,51 +594,68 @@ class IOTBenchmark(PerformanceTester):
     
     def test_json_performance(self, iterations: int = 10000) -> Dict[str, Any]:
         """测试JSON序列化性能"""
-        test_data = {
-            "users": [
-                {"id": i, "name": f"User{i}", "email": f"user{i}@example.com"}
-                for i in range(100)
-            ]
-        }
-        
-        def json_serialization():
-            return json.dumps(test_data)
+        test_data = self.json_payload
+        dumps = json.dumps
+        loads = json.loads
         
-        def json_deserialization(data: str):
-            return json.loads(data)
+        def json_serialization(data: Dict[str, Any]):
+            return dumps(data)
         
-        serialized = json.dumps(test_data)
+        def json_deserialization(data: bytes):
+            return loads(data)
         
-        return {
-            'json_serialization': self.measure_time(json_serialization),
-            'json_deserialization': self.measure_time(json_deserialization, serialized)
+        results = {
+            'json_serialization': self.measure_time_repeated(json_serialization, test_data),
+            'json_deserialization': self.measure_time_repeated(json_deserialization,
+                                                               self.json_payload_bytes)
         }
+        
+        if fast_json is not None:
+            name = fast_json.__name__
+            # orjson.dumps 直接返回 bytes, 反序列化输入无需再编码
+            fast_serialized = fast_json.dumps(test_data)
+            results[f'{name}_serialization'] = self.measure_time_repeated(
+                fast_json.dumps, test_data)
+            results[f'{name}_deserialization'] = self.measure_time_repeated(
+                fast_json.loads, fast_serialized)
+        
+        return results
 
 class ConcurrencyBenchmark(PerformanceTester):
     """并发性能基准测试"""
     
+    def __init__(self):
+        super().__init__()
+        if _sqrt_sum_nogil is not None:
+            _sqrt_sum_nogil(np.ones(1), 0, 1)
+    
     def test_threading_performance(self, num_threads: int = 4, iterations: int = 1000000) -> Dict[str, Any]:
-        """测试多线程性能"""
+        """测试多线程性能
+        
+        single_thread/multi_thread 为GIL演示: 普通CPython下纯Python的CPU密集任务
+        无法靠多线程加速 (自由线程构建除外). 安装numba与numpy时另测释放GIL的
+        编译内核 (对随机数组做浮点归约), 以 gil_scaling = 单线程耗时 / 多线程耗时 表示线程扩展比.
+        """
         
         def cpu_bound_task(start: int, end: int) -> int:
             return sum(range(start, end))
         
-        def single_thread():
+        def single_thread(task=cpu_bound_task):
             chunk_size = iterations // num_threads
             results = []
             for i in range(num_threads):
                 start = i * chunk_size
                 end = (i + 1) * chunk_size if i < num_threads - 1 else iterations
-                results.append(cpu_bound_task(start, end))
+                results.append(task(start, end))
             return sum(results)
         
-        def multi_thread():
+        def multi_thread(task=cpu_bound_task):
             chunk_size = iterations // num_threads
             threads = []
             results = [0] * num_threads
             
             def worker(thread_id: int, start: int, end: int):
-                results[thread_id] = cpu_bound_task(start, end)
+                results[thread_id] = task(start, end)
             
             for i in range(num_threads):
                 start = i * chunk_size
@@ -330,32 +669,40 @@ class ConcurrencyBenchmark(PerformanceTester):
             
             return sum(results)
         
-        return {
+        results = {
             'single_thread': self.measure_time(single_thread),
             'multi_thread': self.measure_time(multi_thread)
         }
+        
+        if _sqrt_sum_nogil is not None:
+            # 数组在计时区外生成, 各线程只读共享同一块缓冲
+            nogil_task = functools.partial(_sqrt_sum_nogil, _rng.random(iterations))
+            results['single_thread_nogil'] = self.measure_time(single_thread, nogil_task)
+            results['multi_thread_nogil'] = self.measure_time(multi_thread, nogil_task)
+        
+        for suffix in ('', '_nogil'):
+            if 'multi_thread' + suffix in results:
+                multi = results['multi_thread' + suffix]
+                multi['gil_scaling'] = (results['single_thread' + suffix]['execution_time']
+                                        / multi['execution_time'])
+        
+        return results
     
     def test_multiprocessing_performance(self, num_processes: int = 4, iterations: int = 1000000) -> Dict[str, Any]:
         """测试多进程性能"""
         
-        def cpu_bound_task(data: List[int]) -> int:
-            return sum(data)
-        
         def single_process():
-            data = list(range(iterations))
-            return cpu_bound_task(data)
+            return _sum_range((0, iterations))
         
         def multi_process():
             chunk_size = iterations // num_processes
-            data_chunks = []
-            
-            for i in range(num_processes):
-                start = i * chunk_size
-                end = (i + 1) * chunk_size if i < num_processes - 1 else iterations
-                data_chunks.append(list(range(start, end)))
+            bounds = [
+                (i * chunk_size, (i + 1) * chunk_size if i < num_processes - 1 else iterations)
+                for i in range(num_processes)
+            ]
             
-            with ProcessPoolExecutor(max_workers=num_processes) as executor:
-                results = list(executor.map(cpu_bound_task, data_chunks))
+            executor = _get_process_pool(num_processes)
+            results = executor.map(_sum_range, bounds, chunksize=1)
             
             return sum(results)
         
@@ -367,23 +714,43 @@ class ConcurrencyBenchmark(PerformanceTester):
 class AlgorithmBenchmark(PerformanceTester):
     """算法性能基准测试"""
     
+    QUICKSORT_CUTOFF = 32
+    
     def test_sorting_algorithms(self, array_size: int = 10000) -> Dict[str, Any]:
         """测试排序算法性能"""
         
         def generate_random_array():
-            return [random.randint(0, 1000000) for _ in range(array_size)]
+            return _random_ints(0, 1000000, array_size)
         
         def builtin_sort(data):
             return sorted(data)
         
         def quicksort(arr):
-            if len(arr) <= 1:
-                return arr
-            pivot = arr[len(arr) // 2]
-            left = [x for x in arr if x < pivot]
-            middle = [x for x in arr if x == pivot]
-            right = [x for x in arr if x > pivot]
-            return quicksort(left) + middle + quicksort(right)
+            # 显式栈代替递归, 不受递归深度限制; 小分段交给 sorted (内省排序思路)
+            cutoff = self.QUICKSORT_CUTOFF
+            output = []
+            stack = [(arr, False)]
+            while stack:
+                part, done = stack.pop()
+                if done or len(part) <= cutoff:
+                    output.extend(part if done else sorted(part))
+                    continue
+                # 单遍三路划分, 替代三次列表推导
+                pivot = part[len(part) // 2]
+                left, middle, right = [], [], []
+                la, ma, ra = left.append, middle.append, right.append
+                for x in part:
+                    if x < pivot:
+                        la(x)
+                    elif x == pivot:
+                        ma(x)
+                    else:
+                        ra(x)
+                # 后进先出, 按 right/middle/left 入栈使输出保持升序
+                stack.append((right, False))
+                stack.append((middle, True))
+                stack.append((left, False))
+            return output
         
         def bubblesort(arr):
             n = len(arr)
@@ -396,17 +763,34 @@ class AlgorithmBenchmark(PerformanceTester):
         
         test_data = generate_random_array()
         
-        return {
+        results = {
             'builtin_sort': self.measure_time(builtin_sort, test_data[:]),
             'quicksort': self.measure_time(quicksort, test_data[:]),
             'bubblesort': self.measure_time(bubblesort, test_data[:])
         }
+        
+        if _quicksort_jit is not None:
+            def quicksort_jit(arr):
+                _quicksort_jit(arr)
+                return arr
+            
+            def bubblesort_jit(arr):
+                _bubblesort_jit(arr)
+                return arr
+            
+            # 类型化数组在计时区外构造, 内核原地排序
+            results['quicksort_jit'] = self.measure_time(
+                quicksort_jit, np.array(test_data, dtype=np.int64))
+            results['bubblesort_jit'] = self.measure_time(
+                bubblesort_jit, np.array(test_data, dtype=np.int64))
+        
+        return results
     
     def test_search_algorithms(self, array_size: int = 100000) -> Dict[str, Any]:
         """测试搜索算法性能"""
         
         def generate_sorted_array():
-            return sorted([random.randint(0, 1000000) for _ in range(array_size)])
+            return sorted(_random_ints(0, 1000000, array_size))
         
         def linear_search(arr, target):
             for i, val in enumerate(arr):
@@ -429,23 +813,79 @@ class AlgorithmBenchmark(PerformanceTester):
         test_array = generate_sorted_array()
         target = test_array[array_size // 2]  # 存在的目标
         
-        return {
-            'linear_search': self.measure_time(linear_search, test_array, target),
-            'binary_search': self.measure_time(binary_search, test_array, target)
+        # 纯 Python 版本主要反映解释器分派开销, 以 _py 标注;
+        # 各变体统一用 measure_time_repeated 计时, 结果可直接比较
+        results = {
+            'linear_search_py': self.measure_time_repeated(linear_search, test_array, target),
+            'binary_search_py': self.measure_time_repeated(binary_search, test_array, target)
         }
 
+        if np is not None:
+            def linear_search_np(arr, target):
+                hits = np.flatnonzero(arr == target)
+                return int(hits[0]) if hits.size else -1
+
+            def binary_search_np(arr, target):
+                i = int(np.searchsorted(arr, target))
+                return i if i < arr.size and arr[i] == target else -1
+
+            # 数组在计时区外转换, 只测向量化比较与 C 层二分本身
+            arr = np.asarray(test_array, dtype=np.int64)
+            results['linear_search_np'] = self.measure_time_repeated(linear_search_np, arr, target)
+            results['binary_search_np'] = self.measure_time_repeated(binary_search_np, arr, target)
+
+        return results
+
 class NetworkBenchmark(PerformanceTester):
     """网络性能基准测试"""
     
     def test_http_client(self, num_requests: int = 100) -> Dict[str, Any]:
-        """测试HTTP客户端性能"""
+        """测试HTTP客户端性能
+        
+        优先用 httpx.AsyncClient 并发发出全部请求, 总耗时约为单次往返而非逐个累加;
+        未安装 httpx 时回退到 requests 串行请求.
+        """
+        url = 'https://httpbin.org/delay/0.1'
+        
+        try:
+            import httpx
+        except ImportError:
+            httpx = None
+        
+        if httpx is not None:
+            # httpx 的 HTTP/2 支持依赖可选的 h2 包, 只探测是否安装, 不导入
+            http2 = importlib.util.find_spec("h2") is not None
+            
+            async def fetch_all():
+                limits = httpx.Limits(max_connections=num_requests)
+                async with httpx.AsyncClient(http2=http2, limits=limits, timeout=5) as client:
+                    responses = await asyncio.gather(
+                        *(client.get(url) for _ in range(num_requests)),
+                        return_exceptions=True
+                    )
+                for i, response in enumerate(responses):
+                    try:
+                        if isinstance(response, BaseException):
+                            raise response
+                        response.raise_for_status()
+                    except Exception as e:
+                        print(f"Request {i} failed: {e}")
+                return num_requests
+            
+            def make_requests_async():
+                return asyncio.run(fetch_all())
+            
+            return {
+                'http_requests': self.measure_time(make_requests_async)
+            }
+        
         try:
             import requests
             
             def make_requests():
                 for i in range(num_requests):
                     try:
-                        response = requests.get('https://httpbin.org/delay/0.1', timeout=5)
+                        response = requests.get(url, timeout=5)
                         response.raise_for_status()
                     except Exception as e:
                         print(f"Request {i} failed: {e}")
@@ -465,16 +905,30 @@ class NetworkBenchmark(PerformanceTester):
 class DatabaseBenchmark(PerformanceTester):
     """数据库性能基准测试"""
     
-    def test_sqlite_performance(self, num_records: int = 10000) -> Dict[str, Any]:
-        """测试SQLite数据库性能"""
-        import sqlite3
+    def test_sqlite_performance(self, num_records: int = 10000,
+                                in_memory: bool = False) -> Dict[str, Any]:
+        """测试SQLite数据库性能
         
-        db_path = '/tmp/test_performance.db'
+        整个测试共用一个连接, 各阶段不再反复打开/关闭数据库、重新预热页缓存;
+        in_memory=True 时使用 :memory: 数据库, 排除文件系统的影响.
+        """
+        import sqlite3
         
-        def create_database():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute('''
+        db_path = ':memory:' if in_memory else '/tmp/test_performance.db'
+        
+        # 测试数据在计时区之外生成
+        ages = _random_ints(18, 80, num_records)
+        rows = [(f"User{i}", f"user{i}@example.com", ages[i])
+                for i in range(num_records)]
+        
+        def create_database(conn):
+            # WAL 模式 (:memory: 数据库会忽略此设置)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            # 负值单位为KiB, 即64MB页缓存
+            conn.execute("PRAGMA cache_size=-65536")
+            conn.execute('''
                 CREATE TABLE IF NOT EXISTS users (
                     id INTEGER PRIMARY KEY,
                     name TEXT,
@@ -482,52 +936,77 @@ class DatabaseBenchmark(PerformanceTester):
                     age INTEGER
                 )
             ''')
-            conn.commit()
-            conn.close()
             return True
         
-        def insert_records():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            for i in range(num_records):
-                cursor.execute(
-                    "INSERT INTO users (name, email, age) VALUES (?, ?, ?)",
-                    (f"User{i}", f"user{i}@example.com", random.randint(18, 80))
+        def insert_records(conn):
+            # 显式单事务 + executemany: 语句只准备一次, 绑定循环在C层完成
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO users (name, email, age) VALUES (?, ?, ?)", rows
+            )
+            conn.execute("COMMIT")
+            return num_records
+        
+        def bulk_load_then_index(conn):
+            # 先批量导入再建索引, 比逐行维护索引更快
+            conn.execute("BEGIN")
+            # 上次运行中断时可能遗留该表
+            conn.execute("DROP TABLE IF EXISTS users_bulk")
+            conn.execute('''
+                CREATE TABLE users_bulk (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT,
+                    email TEXT,
+                    age INTEGER
                 )
-            conn.commit()
-            conn.close()
+            ''')
+            conn.executemany(
+                "INSERT INTO users_bulk (name, email, age) VALUES (?, ?, ?)", rows
+            )
+            conn.execute("CREATE INDEX idx_users_bulk_age ON users_bulk (age)")
+            conn.execute("COMMIT")
             return num_records
         
-        def query_records():
-            conn = sqlite3.connect(db_path)
+        def query_records(conn):
+            # fetchmany 按批流式读取, 不一次性物化全部结果
             cursor = conn.cursor()
+            cursor.arraysize = 1000
             cursor.execute("SELECT * FROM users WHERE age > 30")
-            results = cursor.fetchall()
-            conn.close()
-            return len(results)
-        
-        def update_records():
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("UPDATE users SET age = age + 1 WHERE age < 50")
-            conn.commit()
-            conn.close()
+            count = 0
+            batch = cursor.fetchmany()
+            while batch:
+                count += len(batch)
+                batch = cursor.fetchmany()
+            return count
+        
+        def update_records(conn):
+            conn.execute("BEGIN")
+            cursor = conn.execute("UPDATE users SET age = age + 1 WHERE age < 50")
+            conn.execute("COMMIT")
             return cursor.rowcount
         
-        # 初始化数据库
-        create_database()
-        
-        results = {
-            'insert_records': self.measure_time(insert_records),
-            'query_records': self.measure_time(query_records),
-            'update_records': self.measure_time(update_records)
-        }
-        
-        # 清理
+        # isolation_level=None: 事务边界全部由显式 BEGIN/COMMIT 控制
+        conn = sqlite3.connect(db_path, isolation_level=None)
         try:
-            os.remove(db_path)
-        except FileNotFoundError:
-            pass
+            # 初始化数据库
+            create_database(conn)
+            
+            results = {
+                'insert_records': self.measure_time(insert_records, conn),
+                'bulk_load_then_index': self.measure_time(bulk_load_then_index, conn),
+                'query_records': self.measure_time(query_records, conn),
+                'update_records': self.measure_time(update_records, conn)
+            }
+        finally:
+            conn.close()
+        
+        # 清理 (含WAL模式的附属文件)
+        if not in_memory:
+            for path in (db_path, db_path + '-wal', db_path + '-shm'):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
         
         return results
 
@@ -545,6 +1024,8 @@ class PerformanceReport:
             'network': NetworkBenchmark(),
             'database': DatabaseBenchmark()
         }
+        # 预热(JIT编译等)完成后冻结现存对象, 后续GC不再反复扫描这些长生命周期对象
+        gc.freeze()
     
     def run_all_benchmarks(self) -> Dict[str, Any]:
         """运行所有基准测试"""